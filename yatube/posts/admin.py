@@ -1,29 +1,167 @@
-from django.contrib import admin
-from .models import Comment, Post, Group
+from django.conf import settings
+from django.contrib import admin, messages
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from . import search
+from .feed_cache import bump_feed_generation
+from .models import Comment, Post, Group, UserStats
+from .paginators import EstimatedCountPaginator
+from .publishing import publish_comment, publish_post
 
 
-class PostAdmin(admin.ModelAdmin):
+def count_by(queryset, field):
+    return dict(queryset.order_by().values_list(field).annotate(
+        total=Count('pk')))
+
+
+def delete_with_counters(queryset):
+    """Удаляет строки и в той же транзакции уменьшает счётчики.
+
+    Посты уменьшают UserStats.posts_count авторов, комментарии -
+    Post.comment_count своих постов.
+    """
+    with transaction.atomic():
+        authors, posts = {}, {}
+        if queryset.model is Post:
+            authors = count_by(queryset, 'author_id')
+        elif queryset.model is Comment:
+            posts = count_by(queryset, 'post_id')
+        result = queryset.delete()
+        for author_id, total in authors.items():
+            UserStats.objects.bump(author_id, posts_count=-total)
+        for post_id, total in posts.items():
+            Post.objects.filter(id=post_id).update(
+                comment_count=Greatest(F('comment_count') - total, 0))
+    return result
+
+
+class InputFilter(admin.SimpleListFilter):
+    """Фильтр с полем ввода вместо списка всех значений поля."""
+    template = 'admin/input_filter.html'
+    lookup = None
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        yield {
+            'query_parts': [
+                (key, value)
+                for key, value in changelist.get_filters_params().items()
+                if key != self.parameter_name],
+        }
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if not value:
+            return queryset
+        try:
+            return queryset.filter(**{self.lookup: value})
+        except ValueError:
+            return queryset.none()
+
+
+class AuthorFilter(InputFilter):
+    title = 'автор (username)'
+    parameter_name = 'author'
+    lookup = 'author__username'
+
+
+class PostFilter(InputFilter):
+    title = 'пост (id)'
+    parameter_name = 'post'
+    lookup = 'post_id'
+
+
+class LargeTableAdminMixin:
+    """Списки больших таблиц: без полного COUNT(*) и загрузки всех строк."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('delete_in_batches',)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Стандартное удаление собирает все объекты для подтверждения.
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(permissions=('delete',),
+                  description='Удалить выбранные (пачками)')
+    def delete_in_batches(self, request, queryset):
+        ids = queryset.order_by().values_list('pk', flat=True)
+        deleted = 0
+        while True:
+            # Удалённые строки выпадают из выборки, следующая пачка
+            # снова берётся с начала.
+            batch = list(ids[:settings.ADMIN_BATCH_SIZE])
+            if not batch:
+                break
+            _, per_model = delete_with_counters(
+                self.model.objects.filter(pk__in=batch))
+            deleted += per_model.get(self.model._meta.label, 0)
+        bump_feed_generation()
+        self.message_user(request, f'Удалено: {deleted}', messages.SUCCESS)
+
+
+class FeedAdminMixin:
+    """Правки из админки сбрасывают кэш ленты.
+
+    Новые объекты публикуются через publish, как и во view.
+    """
+    publish = None
+
+    def save_model(self, request, obj, form, change):
+        if not change and self.publish is not None:
+            self.publish(obj)
+            return
+        super().save_model(request, obj, form, change)
+        bump_feed_generation()
+
+    def delete_model(self, request, obj):
+        delete_with_counters(type(obj).objects.filter(pk=obj.pk))
+        bump_feed_generation()
+
+    def delete_queryset(self, request, queryset):
+        delete_with_counters(queryset)
+        bump_feed_generation()
+
+
+class PostAdmin(LargeTableAdminMixin, FeedAdminMixin, admin.ModelAdmin):
     # Перечисляем поля, которые должны отображаться в админке
     list_display = ('id', 'text', 'pub_date', 'author', 'group')
     # Добавляем интерфейс для поиска по тексту постов
     search_fields = ('text',)
     # Добавляем возможность фильтрации по дате
-    list_filter = ('pub_date', 'group')
-    list_editable = ('group', 'text',)
+    list_filter = ('pub_date', 'group', AuthorFilter)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author',)
     empty_value_display = '-пусто-'
+    publish = staticmethod(publish_post)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по тексту идёт через полнотекстовый индекс, а не LIKE.
+        if not search_term:
+            return queryset, False
+        return queryset.filter(id__in=search.search_ids(search_term)), False
 
 
-class GroupAdmin(admin.ModelAdmin):
+class GroupAdmin(FeedAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'description', 'slug',)
     search_fields = ('title',)
     list_filter = ('title',)
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdminMixin, FeedAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'text', 'created', 'author', 'post')
-    search_fields = ('text', 'author', 'post')
-    list_filter = ('created', 'author', 'post')
-    list_editable = ('text',)
+    search_fields = ('text',)
+    list_filter = ('created', AuthorFilter, PostFilter)
+    list_select_related = ('author', 'post')
+    autocomplete_fields = ('author', 'post')
+    publish = staticmethod(publish_comment)
 
 
 admin.site.register(Comment, CommentAdmin)
@@ -0,0 +1,131 @@
+"""JSON API только для чтения: те же ленты, что и HTML-страницы.
+
+Посты и комментарии отдаются словарями из values() без моделей
+и шаблонов, страницы листаются курсором (?cursor=), поля выбираются
+параметром ?fields=id,text,author, размер страницы - ?limit=.
+"""
+import json
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+
+from yatube.settings import COMMENTS_ON_PAGE, POSTS_ON_PAGE
+from . import timeline
+from .models import Comment, Group, Post, User
+from .paginators import CursorPaginator
+
+# Поле ответа и поле выборки, из которого оно берётся.
+FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'created': 'created',
+    'author': 'author__username',
+}
+MAX_LIMIT = 100
+
+
+def error(message, status):
+    return JsonResponse({'detail': message}, status=status)
+
+
+def parse_params(request, available=FIELDS, per_page=POSTS_ON_PAGE):
+    """Поля и размер страницы из запроса; ValueError, если они неверны."""
+    fields = request.GET.get('fields')
+    fields = fields.split(',') if fields else list(available)
+    unknown = set(fields) - set(available)
+    if unknown:
+        raise ValueError(f'Неизвестные поля: {", ".join(sorted(unknown))}')
+    limit = request.GET.get('limit', str(per_page))
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_LIMIT:
+        raise ValueError(f'limit - число от 1 до {MAX_LIMIT}')
+    return fields, int(limit)
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query[CursorPaginator.cursor_param] = cursor
+    return f'{request.path}?{query.urlencode()}'
+
+
+def item(row, fields, available=FIELDS):
+    result = {field: row[available[field]] for field in fields}
+    if 'image' in result:
+        result['image'] = (default_storage.url(result['image'])
+                           if result['image'] else None)
+    return result
+
+
+def stream(rows, fields, next_url, previous_url, available=FIELDS):
+    yield '{"results": ['
+    for number, row in enumerate(rows):
+        yield (',' if number else '') + json.dumps(
+            item(row, fields, available), cls=DjangoJSONEncoder,
+            ensure_ascii=False)
+    yield (f'], "next": {json.dumps(next_url)}, '
+           f'"previous": {json.dumps(previous_url)}}}')
+
+
+def page_response(request, rows, available=FIELDS, per_page=POSTS_ON_PAGE):
+    try:
+        fields, limit = parse_params(request, available, per_page)
+    except ValueError as exception:
+        return error(str(exception), 400)
+    lookups = {'id'} | {available[field] for field in fields}
+    paginator = CursorPaginator(rows.values(*lookups), limit)
+    page = paginator.get_page(request.GET.get(paginator.cursor_param))
+    return StreamingHttpResponse(
+        stream(page.object_list, fields,
+               page_url(request, paginator.next_cursor),
+               page_url(request, paginator.previous_cursor), available),
+        content_type='application/json')
+
+
+@require_safe
+def index(request):
+    return page_response(request, Post.objects.all())
+
+
+@require_safe
+def group_posts(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'id', flat=True).first()
+    if group_id is None:
+        return error('Сообщество не найдено', 404)
+    return page_response(request, Post.objects.filter(group_id=group_id))
+
+
+@require_safe
+def profile(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'id', flat=True).first()
+    if author_id is None:
+        return error('Пользователь не найден', 404)
+    return page_response(request, Post.objects.filter(author_id=author_id))
+
+
+@require_safe
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return error('Нужна авторизация', 401)
+    return page_response(request, timeline.feed(request.user))
+
+
+@require_safe
+def comments(request, post_id):
+    if not Post.objects.filter(id=post_id).exists():
+        return error('Пост не найден', 404)
+    return page_response(request, Comment.objects.filter(post_id=post_id),
+                         COMMENT_FIELDS, COMMENTS_ON_PAGE)
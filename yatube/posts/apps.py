@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from yatube import database, metrics, user_cache  # noqa: F401
+
+        from . import signals  # noqa: F401
@@ -0,0 +1,150 @@
+"""Бюджеты страниц постов и их замер на заполненной базе.
+
+Для каждой страницы хранится предельное число SQL-запросов, 95-й
+перцентиль времени ответа и пик выделенной памяти. Число запросов
+проверяет тест test_benchmark на каждом прогоне, время и память -
+команда `manage.py benchmark` на базе реалистичного объёма.
+"""
+import tracemalloc
+from io import StringIO
+from random import Random
+from statistics import quantiles
+from time import perf_counter
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import follow_graph
+from .bulk import batches
+from .models import Comment, Follow, Group, Post, User
+
+BATCH_SIZE = 5000
+READER_FOLLOWS = 50
+
+BUDGETS = {
+    'index': {'queries': 4, 'p95_ms': 100, 'memory_kb': 1024},
+    'group_posts': {'queries': 5, 'p95_ms': 100, 'memory_kb': 1024},
+    'profile': {'queries': 7, 'p95_ms': 100, 'memory_kb': 1024},
+    'post_view': {'queries': 5, 'p95_ms': 100, 'memory_kb': 1024},
+    'follow_index': {'queries': 6, 'p95_ms': 100, 'memory_kb': 1024},
+    'admin_posts': {'queries': 5, 'p95_ms': 500, 'memory_kb': 4096},
+    'admin_comments': {'queries': 5, 'p95_ms': 500, 'memory_kb': 4096},
+    'admin_groups': {'queries': 6, 'p95_ms': 100, 'memory_kb': 1024},
+}
+ADMIN_PAGES = ('admin_posts', 'admin_comments', 'admin_groups')
+
+
+class Dataset:
+    """Пользователи и объекты, от имени и для которых открываются страницы."""
+    def __init__(self):
+        self.reader = User.objects.get_or_create(username='bench_reader')[0]
+        self.admin = User.objects.get_or_create(
+            username='bench_admin', is_staff=True, is_superuser=True)[0]
+        self.post = Post.objects.order_by('-comment_count', 'id').first()
+        self.group = Group.objects.order_by('id').first()
+
+    def urls(self):
+        post = self.post
+        return {
+            'index': reverse('posts:index'),
+            'group_posts': reverse(
+                'posts:group', kwargs={'slug': self.group.slug}),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': post.author.username}),
+            'post_view': reverse('posts:post', kwargs={
+                'username': post.author.username, 'post_id': post.id}),
+            'follow_index': reverse('posts:follow_index'),
+            'admin_posts': reverse('admin:posts_post_changelist'),
+            'admin_comments': reverse('admin:posts_comment_changelist'),
+            'admin_groups': reverse('admin:posts_group_changelist'),
+        }
+
+
+def seed(users, posts, comments, follows, groups=20, seed=0):
+    """Добавляет в базу данные заданного объёма и пересчитывает счётчики.
+
+    Можно вызывать повторно: новые записи дописываются к уже созданным.
+    """
+    random = Random(seed)
+    start = User.objects.count()
+    for batch in batches((
+            User(username=f'bench{start + i}', password='!')
+            for i in range(users)), BATCH_SIZE):
+        User.objects.bulk_create(batch)
+    start = Group.objects.count()
+    Group.objects.bulk_create(
+        Group(title=f'Group {start + i}', slug=f'bench-{start + i}',
+              description='Benchmark group')
+        for i in range(groups))
+    user_ids = list(User.objects.values_list('id', flat=True))
+    group_ids = list(Group.objects.values_list('id', flat=True))
+    for batch in batches((
+            Post(author_id=random.choice(user_ids),
+                 group_id=random.choice(group_ids + [None]),
+                 text=f'Benchmark post {i}')
+            for i in range(posts)), BATCH_SIZE):
+        Post.objects.bulk_create(batch)
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    for batch in batches((
+            Comment(author_id=random.choice(user_ids),
+                    post_id=random.choice(post_ids),
+                    text=f'Benchmark comment {i}')
+            for i in range(comments)), BATCH_SIZE):
+        Comment.objects.bulk_create(batch)
+    reader = Dataset().reader
+    authors = random.sample(user_ids, min(READER_FOLLOWS, len(user_ids)))
+    pairs = {(reader.id, author_id) for author_id in authors}
+    pairs.update(
+        (random.choice(user_ids), random.choice(user_ids))
+        for _ in range(follows))
+    existing = set(Follow.objects.values_list('user_id', 'author_id'))
+    for batch in batches((
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id, author_id in pairs - existing
+            if user_id != author_id), BATCH_SIZE):
+        Follow.objects.bulk_create(batch)
+    call_command('rebuild_counters', stdout=StringIO())
+    call_command('rebuild_timelines', stdout=StringIO())
+    call_command('rerender_posts', stdout=StringIO())
+    follow_graph.reset()
+    return Dataset()
+
+
+def measure(client, url, repeat):
+    """Запросы, время (мс) и пик памяти (Кб) для страницы без кэша."""
+    timings = []
+    for _ in range(repeat):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = perf_counter()
+            response = client.get(url)
+            timings.append((perf_counter() - started) * 1000)
+        # Журнал запросов очищается в начале каждого следующего запроса.
+        count = len(queries)
+    cache.clear()
+    tracemalloc.start()
+    try:
+        client.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    if len(timings) > 1:
+        p50, p95 = (quantiles(timings, n=100, method='inclusive')[i]
+                    for i in (49, 94))
+    else:
+        p50 = p95 = timings[0]
+    return {
+        'status': response.status_code, 'queries': count,
+        'p50_ms': p50, 'p95_ms': p95, 'memory_kb': peak / 1024,
+    }
+
+
+def over_budget(name, result, metrics=('queries', 'p95_ms', 'memory_kb')):
+    """Описания превышений бюджета страницы."""
+    budget = BUDGETS[name]
+    return [
+        f'{name}: {metric} {result[metric]:.0f} > {budget[metric]}'
+        for metric in metrics if result[metric] > budget[metric]]
@@ -0,0 +1,164 @@
+"""Потоковые выгрузка и загрузка сообществ, постов, комментариев и подписок.
+
+Строки идут пачками: выгрузка читает таблицу по ключу id, загрузка
+пишет bulk_create по batch_size строк, поэтому память не зависит от
+объёма. Авторы и подписчики передаются по username, сообщества - по
+slug, id записей сохраняются, так что повторная загрузка той же пачки
+ничего не дублирует.
+"""
+import csv
+import json
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment, Follow, Group, Post, User
+
+# Порядок загрузки: каждая таблица ссылается только на предыдущие.
+KINDS = ('groups', 'posts', 'comments', 'follows')
+FORMATS = ('jsonl', 'csv')
+MODELS = {'groups': Group, 'posts': Post,
+          'comments': Comment, 'follows': Follow}
+# Колонка файла и поле выборки, из которого она берётся.
+COLUMNS = {
+    'groups': (('id', 'id'), ('title', 'title'), ('slug', 'slug'),
+               ('description', 'description')),
+    'posts': (('id', 'id'), ('author', 'author__username'),
+              ('group', 'group__slug'), ('text', 'text'),
+              ('pub_date', 'pub_date'), ('image', 'image')),
+    'comments': (('id', 'id'), ('post', 'post_id'),
+                 ('author', 'author__username'), ('text', 'text'),
+                 ('created', 'created')),
+    'follows': (('id', 'id'), ('user', 'user__username'),
+                ('author', 'author__username')),
+}
+USER_COLUMNS = {'posts': ('author',), 'comments': ('author',),
+                'follows': ('user', 'author')}
+
+
+def columns(kind):
+    return [column for column, _ in COLUMNS[kind]]
+
+
+def export_rows(kind, after_id=0, batch_size=1000):
+    """Пачки строк таблицы по возрастанию id, начиная после after_id."""
+    lookups = [lookup for _, lookup in COLUMNS[kind]]
+    queryset = MODELS[kind].objects.order_by('id').values_list(*lookups)
+    while True:
+        batch = list(queryset.filter(id__gt=after_id)[:batch_size])
+        if not batch:
+            return
+        yield [dict(zip(columns(kind), row)) for row in batch]
+        after_id = batch[-1][0]
+
+
+def row_writer(file, fmt, kind, header=True):
+    """Функция, дописывающая строку в файл в формате fmt."""
+    if fmt == 'csv':
+        writer = csv.DictWriter(file, columns(kind))
+        if header:
+            writer.writeheader()
+        return writer.writerow
+
+    def write(row):
+        file.write(json.dumps(row, default=datetime.isoformat,
+                              ensure_ascii=False) + '\n')
+    return write
+
+
+def read_rows(file, fmt):
+    if fmt == 'csv':
+        yield from csv.DictReader(file)
+        return
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def user_ids(rows, fields):
+    """id пользователей по username; недостающие создаются без пароля."""
+    names = {row[field] for row in rows for field in fields}
+    known = dict(User.objects.filter(
+        username__in=names).values_list('username', 'id'))
+    missing = names - known.keys()
+    if missing:
+        User.objects.bulk_create(
+            [User(username=name, password=make_password(None))
+             for name in missing], ignore_conflicts=True)
+        known.update(User.objects.filter(
+            username__in=missing).values_list('username', 'id'))
+    return known
+
+
+def to_int(value):
+    return int(value) if value not in (None, '') else None
+
+
+def to_datetime(value):
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    return value or timezone.now()
+
+
+def build(kind, rows):
+    """Объекты для bulk_create; строки со ссылкой в никуда пропускаются."""
+    users = user_ids(rows, USER_COLUMNS.get(kind, ()))
+    if kind == 'groups':
+        return [Group(id=to_int(row['id']), title=row['title'],
+                      slug=row['slug'], description=row['description'])
+                for row in rows]
+    if kind == 'posts':
+        groups = dict(Group.objects.filter(
+            slug__in={row['group'] for row in rows if row['group']}
+        ).values_list('slug', 'id'))
+        return [Post(id=to_int(row['id']), author_id=users[row['author']],
+                     group_id=groups.get(row['group']), text=row['text'],
+                     pub_date=to_datetime(row['pub_date']),
+                     image=row['image'] or '')
+                for row in rows]
+    if kind == 'comments':
+        posts = set(Post.objects.filter(
+            id__in={to_int(row['post']) for row in rows}
+        ).values_list('id', flat=True))
+        return [Comment(id=to_int(row['id']), post_id=to_int(row['post']),
+                        author_id=users[row['author']], text=row['text'],
+                        created=to_datetime(row['created']))
+                for row in rows if to_int(row['post']) in posts]
+    return [Follow(id=to_int(row['id']), user_id=users[row['user']],
+                   author_id=users[row['author']])
+            for row in rows if row['user'] != row['author']]
+
+
+def taken_ids(model, objects):
+    """id из файла, которые в базе уже заняты другими строками."""
+    ids = [obj.id for obj in objects if obj.id is not None]
+    return sorted(model.objects.filter(id__in=ids).values_list(
+        'id', flat=True))
+
+
+@contextmanager
+def original_dates(model):
+    """Даты из файла не заменяются временем загрузки (auto_now_add)."""
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
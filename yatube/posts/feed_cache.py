@@ -0,0 +1,203 @@
+"""Кэш страниц ленты без фиксированного TTL.
+
+Ключ страницы включает номер поколения ленты. Любое изменение постов,
+комментариев или сообществ увеличивает поколение, после чего старые
+страницы становятся недостижимы и вытесняются кэшем сами.
+
+Кроме общего поколения ленты есть поколения частей сайта: сообщества,
+автора и поста (scopes). По ним строятся ETag страниц, поэтому
+комментарий к одному посту не сбрасывает ETag чужих профилей и
+сообществ. Изменения, видные везде (переименование автора или
+сообщества, правки в админке), меняют поколение всего сайта.
+"""
+import asyncio
+from datetime import datetime, timezone
+from functools import wraps
+from hashlib import md5
+from time import sleep, time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import (get_cache_key, learn_cache_key,
+                                patch_vary_headers)
+
+FEED_GENERATION_KEY = 'feed_generation'
+FEED_CHANGED_KEY = 'feed_generation.changed'
+SITE = 'site'
+LOCK_POLL_INTERVAL = 0.05
+
+
+def feed_generation():
+    # Начальное значение от времени: если ключ вытеснят, новое поколение
+    # всё равно окажется больше любого из уже закэшированных.
+    return cache.get_or_set(FEED_GENERATION_KEY, int(time() * 1000), None)
+
+
+def generation_key(scope):
+    return f'{FEED_GENERATION_KEY}.{scope}'
+
+
+def changed_key(scope):
+    return f'{generation_key(scope)}.changed'
+
+
+def post_scopes(post):
+    """Части сайта, на страницах которых виден пост."""
+    scopes = [f'post.{post.id}', f'author.{post.author.username}']
+    if post.group_id:
+        scopes.append(f'group.{post.group.slug}')
+    return scopes
+
+
+def scoped_generation(*scopes):
+    """Поколения всего сайта и частей scopes одной строкой."""
+    keys = [generation_key(scope) for scope in (SITE, *scopes)]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            found[key] = cache.get_or_set(key, int(time() * 1000), None)
+    return '.'.join(str(found[key]) for key in keys)
+
+
+def feed_changed(*scopes):
+    """Время последнего изменения частей scopes (без них - любого).
+
+    Не раньше настоящего изменения: потерянный ключ считается
+    изменённым сейчас.
+    """
+    keys = [changed_key(scope) for scope in scopes] or [FEED_CHANGED_KEY]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            found[key] = cache.get_or_set(key, int(time()), None)
+    return datetime.fromtimestamp(max(found.values()), timezone.utc)
+
+
+def increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time() * 1000), None)
+
+
+def bump_pages(*scopes):
+    """Меняет поколения частей scopes, без них - всего сайта."""
+    scopes = scopes or (SITE,)
+    for scope in scopes:
+        increment(generation_key(scope))
+    now = int(time())
+    cache.set_many({FEED_CHANGED_KEY: now, **{
+        changed_key(scope): now for scope in scopes}}, None)
+
+
+def bump_feed_generation(*scopes):
+    """Сбрасывает кэш ленты и страницы частей scopes (без них - все)."""
+    increment(FEED_GENERATION_KEY)
+    bump_pages(*scopes)
+
+
+def cached_response(request, prefix):
+    cache_key = get_cache_key(request, prefix, 'GET', cache=cache)
+    return cache.get(cache_key) if cache_key else None
+
+
+def lock_key(request, prefix):
+    # Страницы различаются только по Cookie, поэтому и блокировка своя
+    # для каждой пары (адрес, cookie).
+    variant = request.build_absolute_uri() + request.META.get(
+        'HTTP_COOKIE', '')
+    return f'{prefix}.lock.{md5(variant.encode()).hexdigest()}'
+
+
+def wait_for(request, prefix):
+    """Ждёт, пока страницу положит в кэш воркер, взявший блокировку."""
+    deadline = time() + settings.FEED_CACHE_LOCK_WAIT
+    while time() < deadline:
+        sleep(LOCK_POLL_INTERVAL)
+        response = cached_response(request, prefix)
+        if response is not None:
+            return response
+    return None
+
+
+async def await_page(request, prefix):
+    """wait_for для async-view: ждёт, не занимая поток."""
+    deadline = time() + settings.FEED_CACHE_LOCK_WAIT
+    while time() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        response = await sync_to_async(cached_response)(request, prefix)
+        if response is not None:
+            return response
+    return None
+
+
+def render_and_cache(view, request, prefix, *args, **kwargs):
+    return store(request, view(request, *args, **kwargs), prefix)
+
+
+def store(request, response, prefix):
+    if response.status_code == 200 and not response.streaming:
+        # Страница зависит от пользователя (меню, шапка).
+        patch_vary_headers(response, ('Cookie',))
+        cache_key = learn_cache_key(
+            request, response, settings.FEED_CACHE_TIMEOUT, prefix,
+            cache=cache)
+        cache.set(cache_key, response, settings.FEED_CACHE_TIMEOUT)
+    return response
+
+
+def cache_feed(key_prefix):
+    """Кэширует GET-ответы view до следующей смены поколения ленты."""
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            return async_cache_feed(view, key_prefix)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            prefix = f'{key_prefix}.{feed_generation()}'
+            response = cached_response(request, prefix)
+            if response is not None:
+                return response
+            # Защита от лавины: страницу пересобирает только один запрос.
+            lock = lock_key(request, prefix)
+            locked = cache.add(lock, 1, settings.FEED_CACHE_LOCK_TIMEOUT)
+            if not locked:
+                response = wait_for(request, prefix)
+                if response is not None:
+                    return response
+            try:
+                return render_and_cache(view, request, prefix, *args, **kwargs)
+            finally:
+                if locked:
+                    cache.delete(lock)
+        return wrapper
+    return decorator
+
+
+def async_cache_feed(view, key_prefix):
+    """cache_feed для async-view: кэш и блокировка те же."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await view(request, *args, **kwargs)
+        generation = await sync_to_async(feed_generation)()
+        prefix = f'{key_prefix}.{generation}'
+        response = await sync_to_async(cached_response)(request, prefix)
+        if response is not None:
+            return response
+        lock = lock_key(request, prefix)
+        locked = await cache.aadd(lock, 1, settings.FEED_CACHE_LOCK_TIMEOUT)
+        if not locked:
+            response = await await_page(request, prefix)
+            if response is not None:
+                return response
+        try:
+            response = await view(request, *args, **kwargs)
+            return await sync_to_async(store)(request, response, prefix)
+        finally:
+            if locked:
+                await cache.adelete(lock)
+    return wrapper
@@ -0,0 +1,112 @@
+"""Граф подписок в кэше.
+
+Для каждого пользователя кэшируются множества id тех, на кого он
+подписан, и его подписчиков. Ключи включают версию пользователя:
+сохранение и удаление подписки увеличивают версии обоих участников,
+и старые множества просто перестают читаться, как страницы ленты
+с прошлым поколением. Массовые загрузки в обход сигналов сбрасывают
+весь граф через reset(). Проверка подписки и взаимные подписки
+считаются по множествам без SQL, рекомендации - по подпискам тех,
+на кого подписан пользователь.
+"""
+from collections import Counter
+from time import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Follow
+
+DIRECTIONS = {'following': ('user_id', 'author_id'),
+              'followers': ('author_id', 'user_id')}
+GENERATION_KEY = 'follow_graph.generation'
+
+
+def version_key(user_id):
+    return f'follow_graph.version.{user_id}'
+
+
+def versions(user_ids):
+    """Версии пользователей, к каждой приписано общее поколение графа."""
+    keys = [GENERATION_KEY] + [version_key(user_id) for user_id in user_ids]
+    found = cache.get_many(keys)
+    # Начальная версия от времени, как и поколение ленты: вытесненный
+    # ключ не вернёт к жизни устаревшие множества.
+    for key in keys:
+        if key not in found:
+            version = int(time() * 1000)
+            found[key] = (version if cache.add(key, version, None)
+                          else cache.get(key, version))
+    generation = found[GENERATION_KEY]
+    return {user_id: f'{generation}.{found[version_key(user_id)]}'
+            for user_id in user_ids}
+
+
+def increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time() * 1000), None)
+
+
+def bump(*user_ids):
+    for user_id in user_ids:
+        increment(version_key(user_id))
+
+
+def reset():
+    increment(GENERATION_KEY)
+
+
+def neighbours(direction, user_ids):
+    """{id пользователя: frozenset id соседей} одним запросом на промахи."""
+    user_ids = list(user_ids)
+    keys = {user_id: f'follow_graph.{direction}.{user_id}.{version}'
+            for user_id, version in versions(user_ids).items()}
+    found = cache.get_many(keys.values())
+    result = {user_id: found[key] for user_id, key in keys.items()
+              if key in found}
+    missing = [user_id for user_id in user_ids if user_id not in result]
+    if missing:
+        source, target = DIRECTIONS[direction]
+        loaded = {user_id: set() for user_id in missing}
+        for user_id, other_id in Follow.objects.filter(**{
+                f'{source}__in': missing}).values_list(source, target):
+            loaded[user_id].add(other_id)
+        loaded = {user_id: frozenset(ids) for user_id, ids in loaded.items()}
+        cache.set_many({keys[user_id]: ids for user_id, ids in loaded.items()},
+                       settings.FOLLOW_GRAPH_TIMEOUT)
+        result.update(loaded)
+    return result
+
+
+def following_ids(user_id):
+    return neighbours('following', [user_id])[user_id]
+
+
+def follower_ids(user_id):
+    return neighbours('followers', [user_id])[user_id]
+
+
+def is_following(user_id, author_id):
+    return user_id is not None and author_id in following_ids(user_id)
+
+
+def mutual_ids(user_id):
+    return following_ids(user_id) & follower_ids(user_id)
+
+
+def suggestions(user_id, limit=None):
+    """id авторов, на которых подписаны те, на кого подписан user_id.
+
+    Чем больше таких подписок, тем выше автор в списке.
+    """
+    limit = limit or settings.FOLLOW_SUGGESTIONS
+    following = following_ids(user_id)
+    # Для авторов-знаменитостей хватает части подписок.
+    sample = sorted(following)[:settings.FOLLOW_SUGGESTIONS_SAMPLE]
+    counts = Counter()
+    for ids in neighbours('following', sample).values():
+        counts.update(ids - following - {user_id})
+    return [author_id for author_id, _ in sorted(
+        counts.items(), key=lambda item: (-item[1], item[0]))[:limit]]
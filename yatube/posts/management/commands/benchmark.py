@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+from posts.benchmark import ADMIN_PAGES, BUDGETS, measure, over_budget, seed
+
+
+class Command(BaseCommand):
+    help = ('Замеряет запросы, время и память страниц постов на отдельной '
+            'заполненной базе и сверяет их с бюджетами')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5000)
+        parser.add_argument('--posts', type=int, default=200000)
+        parser.add_argument('--comments', type=int, default=200000)
+        parser.add_argument('--follows', type=int, default=50000)
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Сколько раз открывать каждую страницу')
+        parser.add_argument('--pages', nargs='*', choices=sorted(BUDGETS),
+                            help='Только эти страницы')
+
+    def handle(self, *args, **options):
+        # Данные пишутся в тестовую базу, рабочая остаётся нетронутой.
+        setup_test_environment()
+        database = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            errors = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(database, verbosity=0)
+            teardown_test_environment()
+        if errors:
+            raise CommandError('Превышены бюджеты:\n' + '\n'.join(errors))
+        self.stdout.write(self.style.SUCCESS('Все страницы в бюджете'))
+
+    def run(self, options):
+        self.stdout.write('Заполнение базы...')
+        data = seed(options['users'], options['posts'],
+                    options['comments'], options['follows'])
+        clients = {False: Client(), True: Client()}
+        clients[False].force_login(data.reader)
+        clients[True].force_login(data.admin)
+        self.stdout.write(
+            f'{"страница":<16}{"запросы":>8}{"p50, мс":>10}'
+            f'{"p95, мс":>10}{"память, Кб":>12}')
+        errors = []
+        for name, url in data.urls().items():
+            if options['pages'] and name not in options['pages']:
+                continue
+            result = measure(
+                clients[name in ADMIN_PAGES], url, options['repeat'])
+            self.stdout.write(
+                f'{name:<16}{result["queries"]:>8}{result["p50_ms"]:>10.1f}'
+                f'{result["p95_ms"]:>10.1f}{result["memory_kb"]:>12.0f}')
+            if result['status'] != 200:
+                errors.append(f'{name}: статус {result["status"]}')
+            errors += over_budget(name, result)
+        return errors
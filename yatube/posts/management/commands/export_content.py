@@ -0,0 +1,63 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand
+from posts import bulk
+
+
+class Command(BaseCommand):
+    help = ('Выгружает сообщества, посты, комментарии или подписки '
+            'в JSONL или CSV')
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=bulk.KINDS)
+        parser.add_argument('--output', help='Файл; без него - stdout')
+        parser.add_argument('--format', choices=bulk.FORMATS,
+                            help='По умолчанию - по расширению файла')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        path = options['output']
+        fmt = options['format'] or (
+            'csv' if path and path.endswith('.csv') else 'jsonl')
+        if not path:
+            # Строки уже с переводом строки, OutputWrapper не добавляет свой.
+            self.stdout.ending = ''
+            write = bulk.row_writer(self.stdout, fmt, options['kind'])
+            for batch in bulk.export_rows(
+                    options['kind'], batch_size=options['batch_size']):
+                for row in batch:
+                    write(row)
+            return
+        self.export_to_file(path, fmt, options)
+
+    def export_to_file(self, path, fmt, options):
+        # После сбоя выгрузка продолжается с последней записанной пачки,
+        # недописанный хвост файла отрезается.
+        checkpoint = f'{path}.checkpoint'
+        state = {'after_id': 0, 'offset': 0, 'rows': 0}
+        if os.path.exists(checkpoint):
+            with open(checkpoint) as file:
+                state = json.load(file)
+        mode = 'r+' if state['offset'] else 'w'
+        with open(path, mode, encoding='utf-8', newline='') as file:
+            file.seek(state['offset'])
+            file.truncate()
+            write = bulk.row_writer(
+                file, fmt, options['kind'], header=not state['offset'])
+            for batch in bulk.export_rows(
+                    options['kind'], state['after_id'],
+                    options['batch_size']):
+                for row in batch:
+                    write(row)
+                file.flush()
+                state = {'after_id': batch[-1]['id'], 'offset': file.tell(),
+                         'rows': state['rows'] + len(batch)}
+                with open(checkpoint, 'w') as checkpoint_file:
+                    json.dump(state, checkpoint_file)
+                self.stdout.write(
+                    f'{options["kind"]}: выгружено {state["rows"]}')
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгрузка {options["kind"]} завершена: {state["rows"]} строк'))
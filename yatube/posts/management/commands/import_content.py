@@ -0,0 +1,85 @@
+import json
+import os
+from io import StringIO
+from itertools import islice
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from posts import bulk, follow_graph
+from posts.feed_cache import bump_feed_generation
+
+
+class Command(BaseCommand):
+    help = ('Загружает сообщества, посты, комментарии или подписки '
+            'из JSONL или CSV пачками bulk_create')
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=bulk.KINDS)
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=bulk.FORMATS,
+                            help='По умолчанию - по расширению файла')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--skip-rebuild', action='store_true',
+            help='Не пересчитывать счётчики, поиск и ленты после загрузки '
+                 '(например, если дальше грузятся другие файлы)')
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Загружать в непустую таблицу; совпадение id всё равно '
+                 'останавливает загрузку')
+
+    def handle(self, *args, **options):
+        kind, path = options['kind'], options['path']
+        fmt = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl')
+        model = bulk.MODELS[kind]
+        # Число уже загруженных строк: после сбоя они пропускаются.
+        checkpoint = f'{path}.checkpoint'
+        done = 0
+        if os.path.exists(checkpoint):
+            with open(checkpoint) as file:
+                done = json.load(file)['rows']
+            self.stdout.write(f'{kind}: продолжение после {done} строк')
+        elif not options['force'] and model.objects.exists():
+            raise CommandError(
+                f'{kind}: таблица не пуста, id из файла могут быть заняты. '
+                'Для загрузки в непустую базу укажите --force.')
+        with open(path, encoding='utf-8', newline='') as file:
+            rows = islice(bulk.read_rows(file, fmt), done, None)
+            for batch in bulk.batches(rows, options['batch_size']):
+                with transaction.atomic(), bulk.original_dates(model):
+                    objects = bulk.build(kind, batch)
+                    # Строка с чужим id молча пропала бы, а её комментарии
+                    # достались бы другому посту.
+                    taken = bulk.taken_ids(model, objects)
+                    if taken:
+                        raise CommandError(
+                            f'{kind}: id {", ".join(map(str, taken[:10]))} '
+                            f'уже заняты, загружено {done} строк. Если это '
+                            'строки прерванной загрузки, укажите их число '
+                            f'в {checkpoint}.')
+                    # Остаются совпадения slug сообществ и пар подписок.
+                    model.objects.bulk_create(objects, ignore_conflicts=True)
+                done += len(batch)
+                with open(checkpoint, 'w') as checkpoint_file:
+                    json.dump({'rows': done}, checkpoint_file)
+                self.stdout.write(f'{kind}: загружено {done}')
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.reset_sequences(model)
+        if not options['skip_rebuild']:
+            for command in ('rebuild_counters', 'rebuild_search_index',
+                            'rebuild_timelines', 'rerender_posts'):
+                call_command(command, stdout=StringIO())
+            bump_feed_generation()
+            follow_graph.reset()
+        self.stdout.write(self.style.SUCCESS(
+            f'Загрузка {kind} завершена: {done} строк'))
+
+    def reset_sequences(self, model):
+        # id брались из файла, счётчик автоинкремента PostgreSQL отстал.
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [model]):
+                cursor.execute(sql)
@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+from statistics import quantiles
+from time import perf_counter
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = ('/', '/api/posts/')
+
+
+class Command(BaseCommand):
+    help = ('Нагружает запущенный сервер одновременными запросами и выводит '
+            'пропускную способность и перцентили времени ответа')
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', help='Например, http://127.0.0.1:8000')
+        parser.add_argument('--paths', nargs='*', default=DEFAULT_PATHS,
+                            help='Страницы, открываемые по кругу')
+        parser.add_argument('--concurrency', type=int, default=50,
+                            help='Одновременных соединений')
+        parser.add_argument('--requests', type=int, default=1000,
+                            help='Всего запросов')
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def handle(self, *args, **options):
+        urls = [urljoin(options['base_url'], path)
+                for path in options['paths']]
+        timeout = options['timeout']
+
+        def fetch(number):
+            started = perf_counter()
+            try:
+                with urlopen(urls[number % len(urls)],
+                             timeout=timeout) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (HTTPError, URLError, OSError):
+                ok = False
+            return ok, (perf_counter() - started) * 1000
+
+        started = perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            results = list(pool.map(fetch, range(options['requests'])))
+        elapsed = perf_counter() - started
+        timings = [ms for ok, ms in results if ok]
+        errors = len(results) - len(timings)
+        if len(timings) < 2:
+            raise CommandError(f'Успешных ответов: {len(timings)}')
+        percentiles = quantiles(timings, n=100, method='inclusive')
+        self.stdout.write(
+            f'запросов {len(results)}, ошибок {errors}, '
+            f'{len(timings) / elapsed:.1f} в секунду\n'
+            f'p50 {percentiles[49]:.1f} мс, p95 {percentiles[94]:.1f} мс, '
+            f'p99 {percentiles[98]:.1f} мс')
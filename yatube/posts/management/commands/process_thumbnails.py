@@ -0,0 +1,23 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+from posts import thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Строит миниатюры картинок из очереди ThumbnailTask'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Не завершаться, ждать новые задачи')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Пауза между опросами очереди, сек.')
+
+    def handle(self, *args, **options):
+        while True:
+            done = thumbnails.run_pending()
+            if done:
+                self.stdout.write(f'Обработано задач: {done}')
+            if not options['loop']:
+                break
+            sleep(options['interval'])
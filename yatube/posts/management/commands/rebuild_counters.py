@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from posts.models import Comment, Follow, Post, User, UserStats
+
+BATCH_SIZE = 1000
+
+
+def count_of(queryset, field):
+    """Подзапрос с числом строк queryset, связанных с текущей строкой."""
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by().values(field).annotate(total=Count('id'))
+        .values('total')), 0)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает с нуля счётчики комментариев, постов и подписок'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            Post.objects.update(
+                comment_count=count_of(Comment.objects, 'post'))
+            UserStats.objects.all().delete()
+            users = User.objects.annotate(
+                posts_total=count_of(Post.objects, 'author'),
+                followers_total=count_of(Follow.objects, 'author'),
+                following_total=count_of(Follow.objects, 'user'),
+            ).values_list(
+                'id', 'posts_total', 'followers_total', 'following_total')
+            UserStats.objects.bulk_create(
+                (UserStats(user_id=user_id, posts_count=posts,
+                           followers_count=followers,
+                           following_count=following)
+                 for user_id, posts, followers, following
+                 in users.iterator(chunk_size=BATCH_SIZE)),
+                batch_size=BATCH_SIZE)
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики пересчитаны: {UserStats.objects.count()} польз.'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from posts import search
+from posts.models import Comment, Post
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Заново строит поисковый индекс постов и комментариев'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            search.create_index()
+            search.clear()
+            sources = (
+                Post.objects.values_list('id', 'text', 'id'),
+                Comment.objects.values_list('id', 'text', 'post_id'),
+            )
+            total = 0
+            for sign, rows in zip((1, -1), sources):
+                batch = []
+                for row_id, text, post_id in rows.iterator(BATCH_SIZE):
+                    batch.append((sign * row_id, text, post_id))
+                    if len(batch) == BATCH_SIZE:
+                        search.write(batch)
+                        total += len(batch)
+                        batch = []
+                search.write(batch)
+                total += len(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано записей: {total}'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from posts import timeline
+from posts.models import Follow, TimelineEntry
+
+
+class Command(BaseCommand):
+    help = 'Заново раскладывает посты по лентам подписчиков'
+
+    def handle(self, *args, **options):
+        if not timeline.is_enabled():
+            self.stdout.write('TIMELINE_ENABLED выключен, ленты не нужны')
+            return
+        with transaction.atomic():
+            TimelineEntry.objects.all().delete()
+            follows = Follow.objects.select_related('user', 'author')
+            for follow in follows.iterator():
+                timeline.backfill(follow.user, follow.author)
+        self.stdout.write(self.style.SUCCESS('Ленты подписок пересобраны'))
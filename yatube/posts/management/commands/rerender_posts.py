@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from posts import rendering
+from posts.feed_cache import bump_feed_generation
+from posts.models import Post
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = ('Заново готовит HTML постов, собранный по старым правилам '
+            '(rendering.RENDER_VERSION)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Все посты, а не только устаревшие')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.order_by('id').only('id', 'text')
+        if not options['all']:
+            posts = posts.exclude(render_version=rendering.RENDER_VERSION)
+        total = 0
+        last_id = 0
+        while True:
+            batch = list(posts.filter(id__gt=last_id)[:BATCH_SIZE])
+            if not batch:
+                break
+            for post in batch:
+                rendering.render_post(post)
+            Post.objects.bulk_update(batch, rendering.RENDERED_FIELDS)
+            total += len(batch)
+            last_id = batch[-1].id
+        bump_feed_generation()
+        self.stdout.write(self.style.SUCCESS(f'Обновлено постов: {total}'))
@@ -0,0 +1,34 @@
+# Generated by Django 4.0.6 on 2026-10-18 20:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnails_pending',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Миниатюры готовятся'),
+        ),
+        migrations.CreateModel(
+            name='ThumbnailTask',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата постановки')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='Занята до')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='thumbnail_tasks', to='posts.post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Задача на миниатюры',
+                'verbose_name_plural': 'Задачи на миниатюры',
+                'ordering': ['id'],
+            },
+        ),
+    ]
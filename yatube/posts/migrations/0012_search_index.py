@@ -0,0 +1,24 @@
+# Generated by Django 4.0.6 on 2026-10-18 21:10
+
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    from posts.search import create_index
+    create_index(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    from posts.search import drop_index
+    drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_thumbnail_queue'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.0.6 on 2026-10-18 20:40
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    # До этой миграции уникальность подписок в базе не проверялась.
+    Follow = apps.get_model('posts', 'Follow')
+    keep = Follow.objects.values('user', 'author').annotate(keep=Min('id'))
+    Follow.objects.exclude(
+        id__in=[row['keep'] for row in keep]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_follows,
+                             migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='timelineentry',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', '-id'], name='comment_post_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-id'], name='post_author_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-id'], name='post_group_id_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='unique_follow'),
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_timeline_entry'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.0.6 on 2026-10-18 21:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_html',
+            field=models.TextField(default='', editable=False, verbose_name='HTML анонса'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='render_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Версия HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(default='', editable=False, verbose_name='HTML текста'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def count_of(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by().values(field).annotate(total=Count('id'))
+        .values('total')), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    # Счётчики появились в 0008, но заполнялись только для новых
+    # записей: пересчитываем их по данным, как rebuild_counters.
+    Comment = apps.get_model('posts', 'Comment')
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    UserStats = apps.get_model('posts', 'UserStats')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Post.objects.update(comment_count=count_of(Comment.objects, 'post'))
+    UserStats.objects.all().delete()
+    users = User.objects.annotate(
+        posts_total=count_of(Post.objects, 'author'),
+        followers_total=count_of(Follow.objects, 'author'),
+        following_total=count_of(Follow.objects, 'user'),
+    ).values_list('id', 'posts_total', 'followers_total', 'following_total')
+    UserStats.objects.bulk_create(
+        (UserStats(user_id=user_id, posts_count=posts,
+                   followers_count=followers, following_count=following)
+         for user_id, posts, followers, following
+         in users.iterator(chunk_size=BATCH_SIZE)),
+        batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0014_rendered_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
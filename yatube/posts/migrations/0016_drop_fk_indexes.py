@@ -0,0 +1,35 @@
+# Generated by Django 4.0.6 on 2026-10-18 21:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0015_backfill_counters'),
+    ]
+
+    # Индексы (author, -id), (group, -id) и (post, -id) из 0013 покрывают
+    # выборки по одному внешнему ключу. Рядом с ними одиночные индексы
+    # только замедляют запись, а в SQLite планировщик ещё и выбирал их
+    # вместо составных, хотя сортировка по id есть и там, и там.
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='post',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='posts.post', verbose_name='Пост'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='author',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='posts', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='group',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='posts', to='posts.group', verbose_name='Сообщество'),
+        ),
+    ]
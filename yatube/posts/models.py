@@ -1,6 +1,10 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.contrib.auth import get_user_model
 
+from . import rendering
+
 User = get_user_model()
 
 
@@ -17,29 +21,64 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для ленты: автор и сообщество одним запросом."""
+        return self.select_related('author', 'group')
+
+
 class Post(models.Model):
     text = models.TextField('Текст поста')
     pub_date = models.DateTimeField('Дата публикации',
                                     auto_now_add=True)
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
+    # Отдельные индексы внешних ключей не нужны: их заменяют составные
+    # индексы из Meta, начинающиеся с того же поля.
     author = models.ForeignKey(User, models.CASCADE,
                                related_name='posts',
-                               verbose_name='Автор')
+                               verbose_name='Автор',
+                               db_index=False)
     image = models.ImageField(upload_to='posts/',
                               verbose_name='Картинка',
                               blank=True, null=True)
     group = models.ForeignKey(Group, models.PROTECT,
                               related_name='posts',
                               verbose_name='Сообщество',
-                              blank=True, null=True)
+                              blank=True, null=True, db_index=False)
+    comment_count = models.PositiveIntegerField('Комментариев',
+                                                default=0, editable=False)
+    thumbnails_pending = models.BooleanField('Миниатюры готовятся',
+                                             default=False, editable=False)
+    text_html = models.TextField('HTML текста', default='', editable=False)
+    excerpt_html = models.TextField('HTML анонса', default='',
+                                    editable=False)
+    render_version = models.PositiveSmallIntegerField(
+        'Версия HTML', default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
         ordering = ['-id']
+        indexes = [
+            models.Index(fields=['author', '-id'], name='post_author_id_idx'),
+            models.Index(fields=['group', '-id'], name='post_group_id_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        # HTML готовится здесь, а не в шаблоне на каждый показ.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            rendering.render_post(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, *rendering.RENDERED_FIELDS}
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     text = models.TextField('Текст комментария')
@@ -48,7 +87,8 @@ class Comment(models.Model):
                                verbose_name='Автор')
     post = models.ForeignKey(Post, models.CASCADE,
                              related_name='comments',
-                             verbose_name='Пост')
+                             verbose_name='Пост',
+                             db_index=False)
     created = models.DateTimeField('Дата публикации',
                                    auto_now_add=True)
 
@@ -56,6 +96,9 @@ class Comment(models.Model):
         verbose_name = 'Комметарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['-id']
+        indexes = [
+            models.Index(fields=['post', '-id'], name='comment_post_id_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.text[:15]
@@ -70,8 +113,75 @@ class Follow(models.Model):
                                verbose_name='Автор')
 
     class Meta:
-        models.UniqueConstraint = (
-            ['user', 'author'], '%(app_label)s_%(class)s_is_adult')
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'author'],
+                                    name='unique_follow')]
 
     def __str__(self) -> str:
         return f'{self.user.username}-->{self.author.username}'
+
+
+class UserStatsManager(models.Manager):
+    def bump(self, user_id, **deltas):
+        """Атомарно сдвигает счётчики пользователя на заданные величины.
+
+        Счётчик не опускается ниже нуля, даже если он отстал от данных.
+        """
+        self.get_or_create(user_id=user_id)
+        self.filter(user_id=user_id).update(**{
+            field: Greatest(F(field) + delta, 0)
+            for field, delta in deltas.items()})
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(User, models.CASCADE,
+                                related_name='stats',
+                                verbose_name='Пользователь')
+    posts_count = models.PositiveIntegerField('Записей', default=0)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+
+    objects = UserStatsManager()
+
+    class Meta:
+        verbose_name = 'Счётчики пользователя'
+        verbose_name_plural = 'Счётчики пользователей'
+
+    def __str__(self) -> str:
+        return f'{self.user_id}: {self.posts_count}'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(User, models.CASCADE,
+                             related_name='timeline',
+                             verbose_name='Читатель')
+    post = models.ForeignKey(Post, models.CASCADE,
+                             related_name='timeline_entries',
+                             verbose_name='Пост')
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи лент'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'],
+                                    name='unique_timeline_entry')]
+
+    def __str__(self) -> str:
+        return f'{self.user_id}: {self.post_id}'
+
+
+class ThumbnailTask(models.Model):
+    post = models.ForeignKey(Post, models.CASCADE,
+                             related_name='thumbnail_tasks',
+                             verbose_name='Пост')
+    created = models.DateTimeField('Дата постановки', auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    locked_until = models.DateTimeField('Занята до', blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Задача на миниатюры'
+        verbose_name_plural = 'Задачи на миниатюры'
+        ordering = ['id']
+
+    def __str__(self) -> str:
+        return f'{self.post_id}: {self.attempts}'
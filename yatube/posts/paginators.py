@@ -0,0 +1,125 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as DecodeError
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+AFTER = 'a'
+BEFORE = 'b'
+
+
+def encode_cursor(direction, pk):
+    token = f'{direction}{pk}'.encode()
+    return urlsafe_b64encode(token).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Возвращает (направление, id) или (None, None) для битого курсора."""
+    if not cursor:
+        return None, None
+    try:
+        token = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        direction, pk = token[0], int(token[1:])
+    except (DecodeError, UnicodeDecodeError, ValueError, IndexError):
+        return None, None
+    if direction not in (AFTER, BEFORE):
+        return None, None
+    return direction, pk
+
+
+class CursorPaginator(Paginator):
+    """Пагинация по ключу id вместо COUNT(*) и OFFSET.
+
+    Queryset должен быть упорядочен по '-id' (Post.Meta.ordering),
+    поэтому любая страница стоит столько же, сколько первая.
+    Возвращает обычный Page: номер страницы и число страниц
+    подбираются так, чтобы has_next/has_previous работали как обычно.
+    """
+    cursor_param = 'cursor'
+
+    @staticmethod
+    def key(row):
+        # Строки бывают и моделями, и словарями из values().
+        return row['id'] if isinstance(row, dict) else row.id
+
+    def rows(self, direction, pk):
+        """Запрос строк страницы и одной лишней, чтобы узнать о следующей."""
+        limit = self.per_page + 1
+        if direction == AFTER:
+            return self.object_list.filter(id__lt=pk)[:limit]
+        if direction == BEFORE:
+            return self.object_list.filter(id__gt=pk).reverse()[:limit]
+        return self.object_list[:limit]
+
+    def get_page(self, cursor):
+        direction, pk = decode_cursor(cursor)
+        return self.build_page(direction, list(self.rows(direction, pk)))
+
+    async def aget_page(self, cursor):
+        direction, pk = decode_cursor(cursor)
+        rows = [row async for row in self.rows(direction, pk)]
+        return self.build_page(direction, rows)
+
+    def build_page(self, direction, rows):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == BEFORE:
+            rows.reverse()
+            has_previous, has_next = has_more, True
+        else:
+            has_previous, has_next = direction == AFTER, has_more
+        if not rows:
+            has_previous = has_next = False
+
+        self.next_cursor = (
+            encode_cursor(AFTER, self.key(rows[-1])) if has_next else None)
+        self.previous_cursor = (
+            encode_cursor(BEFORE, self.key(rows[0]))
+            if has_previous else None)
+        number = 2 if has_previous else 1
+        self.num_pages = number + has_next
+        return self._get_page(rows, number, self)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор админки без COUNT(*) по всей таблице.
+
+    Без фильтров число строк берётся из статистики PostgreSQL или по
+    наибольшему id, с фильтрами считается не дальше count_limit строк:
+    страницы дальше этого предела не показываются, их сужают фильтром.
+    """
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            return estimated_count(queryset)
+        return queryset[:self.count_limit].count()
+
+
+class KnownCountPaginator(Paginator):
+    """Пагинатор с заранее известным числом строк, например из счётчика."""
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.known_count = count
+
+    @cached_property
+    def count(self):
+        return self.known_count
+
+
+def estimated_count(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        # До первого ANALYZE статистика пуста (-1 или 0).
+        if row and row[0] > 0:
+            return row[0]
+    return queryset.aggregate(last=Max('pk'))['last'] or 0
@@ -0,0 +1,29 @@
+"""Публикация постов и комментариев вместе со всем, что от неё зависит.
+
+Сохранение, счётчики, раскладка по лентам подписчиков и очередь
+миниатюр идут одной транзакцией, после неё сбрасываются кэш ленты
+и ETag страниц поста. Так публикуют и view, и админка.
+"""
+from django.db import transaction
+from django.db.models import F
+
+from . import thumbnails, timeline
+from .feed_cache import bump_feed_generation, post_scopes
+from .models import Post, UserStats
+
+
+def publish_post(post):
+    with transaction.atomic():
+        post.save()
+        UserStats.objects.bump(post.author_id, posts_count=1)
+        timeline.fan_out(post)
+        thumbnails.enqueue(post)
+    bump_feed_generation(*post_scopes(post))
+
+
+def publish_comment(comment):
+    with transaction.atomic():
+        comment.save()
+        Post.objects.filter(id=comment.post_id).update(
+            comment_count=F('comment_count') + 1)
+    bump_feed_generation(*post_scopes(comment.post))
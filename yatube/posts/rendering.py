@@ -0,0 +1,27 @@
+"""HTML текста поста, подготовленный при сохранении.
+
+Те же фильтры, что раньше выполнял шаблон карточки на каждый показ:
+linebreaks, truncatewords:30 для ленты и urlize. При изменении правил
+увеличьте RENDER_VERSION и выполните `manage.py rerender_posts`:
+команда перепишет посты со старой версией.
+"""
+from django.template.defaultfilters import (linebreaks_filter, truncatewords,
+                                            urlize)
+from django.utils.safestring import mark_safe
+
+RENDER_VERSION = 1
+EXCERPT_WORDS = 30
+RENDERED_FIELDS = ('text_html', 'excerpt_html', 'render_version')
+
+
+def render_text(text):
+    """(полный HTML, HTML анонса) так же, как их строил шаблон."""
+    paragraphs = linebreaks_filter(text, autoescape=True)
+    excerpt = mark_safe(truncatewords(paragraphs, EXCERPT_WORDS))
+    return (urlize(paragraphs, autoescape=True),
+            urlize(excerpt, autoescape=True))
+
+
+def render_post(post):
+    post.text_html, post.excerpt_html = render_text(post.text)
+    post.render_version = RENDER_VERSION
@@ -0,0 +1,134 @@
+"""Полнотекстовый поиск по постам и комментариям.
+
+Индекс - таблица posts_search: одна строка на пост (id строки = id
+поста) и на комментарий (id строки = -id комментария). На SQLite это
+виртуальная таблица FTS5 с текстом, заранее приведённым к основам
+русским стеммером, на PostgreSQL - tsvector со словарём 'russian'
+и GIN-индексом. На остальных СУБД поиск идёт через icontains.
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .models import Post
+from .stemmer import stem_text
+
+TABLE = 'posts_search'
+
+CREATE_SQL = {
+    'sqlite': [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} '
+        'USING fts5(body, post_id UNINDEXED)',
+    ],
+    'postgresql': [
+        f'CREATE TABLE IF NOT EXISTS {TABLE} ('
+        'id bigint PRIMARY KEY, post_id integer NOT NULL, '
+        'document tsvector NOT NULL)',
+        f'CREATE INDEX IF NOT EXISTS {TABLE}_document '
+        f'ON {TABLE} USING GIN (document)',
+        f'CREATE INDEX IF NOT EXISTS {TABLE}_post ON {TABLE} (post_id)',
+    ],
+}
+INSERT_SQL = {
+    'sqlite': (f'INSERT INTO {TABLE} (rowid, body, post_id) '
+               'VALUES (%s, %s, %s)'),
+    'postgresql': (f'INSERT INTO {TABLE} (id, document, post_id) '
+                   "VALUES (%s, to_tsvector('russian', %s), %s)"),
+}
+DELETE_SQL = {
+    'sqlite': f'DELETE FROM {TABLE} WHERE rowid = %s',
+    'postgresql': f'DELETE FROM {TABLE} WHERE id = %s',
+}
+SEARCH_SQL = {
+    'sqlite': (f'SELECT post_id, min(rank) AS score FROM {TABLE} '
+               f'WHERE {TABLE} MATCH %s GROUP BY post_id '
+               'ORDER BY score LIMIT %s'),
+    'postgresql': (f'SELECT post_id, max(ts_rank(document, query)) AS score '
+                   f"FROM {TABLE}, plainto_tsquery('russian', %s) query "
+                   'WHERE document @@ query GROUP BY post_id '
+                   'ORDER BY score DESC LIMIT %s'),
+}
+
+
+def vendor(conn=connection):
+    return conn.vendor if conn.vendor in CREATE_SQL else None
+
+
+def prepare_text(text):
+    return stem_text(text) if vendor() == 'sqlite' else text
+
+
+def prepare_query(query):
+    if vendor() == 'sqlite':
+        # Каждое слово - отдельная фраза с поиском по префиксу.
+        return ' '.join(f'"{word}"*' for word in stem_text(query).split())
+    return query
+
+
+def create_index(conn=connection):
+    with conn.cursor() as cursor:
+        for sql in CREATE_SQL.get(vendor(conn), ()):
+            cursor.execute(sql)
+
+
+def drop_index(conn=connection):
+    if vendor(conn):
+        with conn.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+def clear():
+    if vendor():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE}')
+
+
+def write(rows):
+    """Перезаписывает строки индекса: rows - (id строки, текст, id поста)."""
+    if not vendor() or not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(DELETE_SQL[vendor()],
+                           [(row_id,) for row_id, _, _ in rows])
+        cursor.executemany(INSERT_SQL[vendor()], [
+            (row_id, prepare_text(text), post_id)
+            for row_id, text, post_id in rows])
+
+
+def remove(row_id):
+    if vendor():
+        with connection.cursor() as cursor:
+            cursor.execute(DELETE_SQL[vendor()], [row_id])
+
+
+def index_post(post):
+    write([(post.id, post.text, post.id)])
+
+
+def index_comment(comment):
+    write([(-comment.id, comment.text, comment.post_id)])
+
+
+def remove_post(post_id):
+    remove(post_id)
+
+
+def remove_comment(comment_id):
+    remove(-comment_id)
+
+
+def search_ids(query):
+    """id постов, подходящих под запрос, от более релевантных."""
+    if not query.strip():
+        return []
+    limit = settings.SEARCH_MAX_RESULTS
+    if not vendor():
+        return list(Post.objects.filter(
+            Q(text__icontains=query) | Q(comments__text__icontains=query)
+        ).order_by('-id').values_list('id', flat=True).distinct()[:limit])
+    prepared = prepare_query(query)
+    if not prepared:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL[vendor()], [prepared, limit])
+        return [post_id for post_id, _ in cursor.fetchall()]
@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import follow_graph, search
+from .feed_cache import bump_feed_generation
+from .models import Comment, Follow, Group, Post, User
+
+# Поля автора, которые видны в карточках постов и профиле.
+AUTHOR_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.remove_post(instance.id)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, **kwargs):
+    search.index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    search.remove_comment(instance.id)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def bump_follow_graph(sender, instance, **kwargs):
+    transaction.on_commit(lambda: follow_graph.bump(
+        instance.user_id, instance.author_id))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def bump_feed_on_group(sender, **kwargs):
+    transaction.on_commit(bump_feed_generation)
+
+
+@receiver(post_save, sender=User)
+def bump_feed_on_author(sender, created, update_fields, **kwargs):
+    # Вход меняет только last_login, новый пользователь ещё нигде не виден.
+    if created or (update_fields and not AUTHOR_FIELDS & set(update_fields)):
+        return
+    transaction.on_commit(bump_feed_generation)
+
+
+@receiver(post_delete, sender=User)
+def bump_feed_on_author_delete(sender, **kwargs):
+    transaction.on_commit(bump_feed_generation)
@@ -0,0 +1,120 @@
+"""Стеммер русского языка по алгоритму Snowball.
+
+Нужен поиску на SQLite: у FTS5 нет русской морфологии, поэтому
+и тексты, и запросы приводятся к основам до обращения к индексу.
+https://snowballstem.org/algorithms/russian/stemmer.html
+"""
+import re
+
+VOWELS = 'аеиоуыэюя'
+WORD = re.compile(r'\w+')
+CYRILLIC = re.compile('[а-я]')
+
+# Окончания группы 1 удаляются, только если перед ними стоит «а» или «я».
+PERFECTIVE_GERUND = (('в', 'вши', 'вшись'),
+                     ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'))
+ADJECTIVE = ((), ('ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый',
+                  'ой', 'ем', 'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому',
+                  'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею'))
+PARTICIPLE = (('ем', 'нн', 'вш', 'ющ', 'щ'), ('ивш', 'ывш', 'ующ'))
+REFLEXIVE = ((), ('ся', 'сь'))
+VERB = (('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но',
+         'ет', 'ют', 'ны', 'ть', 'ешь', 'нно'),
+        ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей',
+         'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят',
+         'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'))
+NOUN = ((), ('а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи',
+             'ии', 'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием',
+             'ем', 'ам', 'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию',
+             'ью', 'ю', 'ия', 'ья', 'я'))
+SUPERLATIVE = ((), ('ейше', 'ейш'))
+DERIVATIONAL = ('ость', 'ост')
+
+
+def longest_first(groups):
+    return sorted(
+        ((ending, index == 0) for index, group in enumerate(groups)
+         for ending in group),
+        key=lambda item: len(item[0]), reverse=True)
+
+
+PERFECTIVE_GERUND = longest_first(PERFECTIVE_GERUND)
+ADJECTIVE = longest_first(ADJECTIVE)
+PARTICIPLE = longest_first(PARTICIPLE)
+REFLEXIVE = longest_first(REFLEXIVE)
+VERB = longest_first(VERB)
+NOUN = longest_first(NOUN)
+SUPERLATIVE = longest_first(SUPERLATIVE)
+
+
+def strip_ending(word, endings):
+    """Убирает самое длинное окончание; None, если убрать нечего."""
+    for ending, needs_a_ya in endings:
+        if word.endswith(ending):
+            stem = word[:-len(ending)]
+            if needs_a_ya and not stem.endswith(('а', 'я')):
+                return None
+            return stem
+    return None
+
+
+def region_start(word, start=0):
+    """Начало области после первой согласной, идущей за гласной."""
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def strip_inflection(rv):
+    """Шаг 1: деепричастие, иначе -ся и прилагательное/глагол/сущ."""
+    stripped = strip_ending(rv, PERFECTIVE_GERUND)
+    if stripped is not None:
+        return stripped
+    reflexive = strip_ending(rv, REFLEXIVE)
+    if reflexive is not None:
+        rv = reflexive
+    stripped = strip_ending(rv, ADJECTIVE)
+    if stripped is not None:
+        participle = strip_ending(stripped, PARTICIPLE)
+        return stripped if participle is None else participle
+    for endings in (VERB, NOUN):
+        stripped = strip_ending(rv, endings)
+        if stripped is not None:
+            return stripped
+    return rv
+
+
+def strip_tail(rv):
+    """Шаг 4: двойное «н», превосходная степень или мягкий знак."""
+    if rv.endswith('нн'):
+        return rv[:-1]
+    stripped = strip_ending(rv, SUPERLATIVE)
+    if stripped is not None:
+        return stripped[:-1] if stripped.endswith('нн') else stripped
+    return rv[:-1] if rv.endswith('ь') else rv
+
+
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    rv_start = next(
+        (i + 1 for i, char in enumerate(word) if char in VOWELS), None)
+    if rv_start is None:
+        return word
+    r2_start = region_start(word, region_start(word))
+    prefix, rv = word[:rv_start], strip_inflection(word[rv_start:])
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    for ending in DERIVATIONAL:
+        if (rv.endswith(ending)
+                and len(prefix) + len(rv) - len(ending) >= r2_start):
+            rv = rv[:-len(ending)]
+            break
+    return prefix + strip_tail(rv)
+
+
+def stem_text(text):
+    """Слова текста через пробел, русские - приведённые к основе."""
+    return ' '.join(
+        stem(word) if CYRILLIC.search(word) else word
+        for word in WORD.findall(text.lower()))
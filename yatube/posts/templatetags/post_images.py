@@ -0,0 +1,37 @@
+import logging
+
+from django import template
+from sorl.thumbnail import get_thumbnail
+
+from .. import thumbnails
+
+register = template.Library()
+logger = logging.getLogger(__name__)
+
+SIZES = '(min-width: 992px) 960px, 100vw'
+
+
+def srcset(image, fmt=None):
+    variants = [get_thumbnail(image, thumbnails.geometry(width),
+                              **thumbnails.options(fmt))
+                for width in thumbnails.WIDTHS]
+    return variants, ', '.join(f'{im.url} {im.width}w' for im in variants)
+
+
+@register.inclusion_tag('includes/post_picture.html')
+def post_picture(image):
+    """Картинка поста: миниатюры всех ширин, WebP/AVIF и ленивая загрузка."""
+    if not image:
+        return {}
+    try:
+        variants, fallback = srcset(image)
+        sources = [
+            {'type': f'image/{fmt.lower()}', 'srcset': srcset(image, fmt)[1]}
+            for fmt in thumbnails.modern_formats()]
+    except Exception:
+        # Как и тег {% thumbnail %}: битая картинка не ломает страницу.
+        logger.exception('Не удалось получить миниатюры %s', image.name)
+        return {'original': image}
+    img = variants[thumbnails.WIDTHS.index(thumbnails.DEFAULT_WIDTH)]
+    return {'img': img, 'srcset': fallback, 'sources': sources,
+            'sizes': SIZES}
@@ -0,0 +1,161 @@
+"""Минимальный сервер с протоколом Redis (RESP2) для тестов.
+
+Поддерживает команды, которыми пользуется
+django.core.cache.backends.redis.RedisCache, и работает в потоке
+внутри тестового процесса, поэтому настоящий Redis для тестов не нужен.
+"""
+import socketserver
+import threading
+from time import monotonic
+
+
+class RedisError(Exception):
+    pass
+
+
+class Storage:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}
+        self.expires = {}
+
+    def alive(self, key):
+        expires = self.expires.get(key)
+        if expires is not None and expires <= monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def execute(self, command, *args):
+        handler = getattr(self, f'cmd_{command.decode().lower()}', None)
+        if handler is None:
+            raise RedisError(f"ERR unknown command '{command.decode()}'")
+        with self.lock:
+            return handler(*args)
+
+    def cmd_ping(self, *args):
+        return b'PONG'
+
+    def cmd_select(self, db):
+        return b'OK'
+
+    def cmd_client(self, *args):
+        return b'OK'
+
+    def cmd_get(self, key):
+        return self.data[key] if self.alive(key) else None
+
+    def cmd_mget(self, *keys):
+        return [self.cmd_get(key) for key in keys]
+
+    def cmd_set(self, key, value, *options):
+        options = [option.upper() for option in options]
+        if b'NX' in options and self.alive(key):
+            return None
+        self.data[key] = value
+        self.expires.pop(key, None)
+        for unit, scale in ((b'EX', 1), (b'PX', 0.001)):
+            if unit in options:
+                ttl = int(options[options.index(unit) + 1]) * scale
+                self.expires[key] = monotonic() + ttl
+        return b'OK'
+
+    def cmd_del(self, *keys):
+        deleted = 0
+        for key in keys:
+            if self.alive(key):
+                deleted += 1
+                del self.data[key]
+                self.expires.pop(key, None)
+        return deleted
+
+    def cmd_exists(self, *keys):
+        return sum(self.alive(key) for key in keys)
+
+    def cmd_incrby(self, key, delta):
+        value = int(self.data[key]) if self.alive(key) else 0
+        value += int(delta)
+        self.data[key] = str(value).encode()
+        return value
+
+    def cmd_incr(self, key):
+        return self.cmd_incrby(key, b'1')
+
+    def cmd_expire(self, key, seconds):
+        if not self.alive(key):
+            return 0
+        self.expires[key] = monotonic() + int(seconds)
+        return 1
+
+    def cmd_persist(self, key):
+        if not self.alive(key) or key not in self.expires:
+            return 0
+        del self.expires[key]
+        return 1
+
+    def cmd_flushdb(self, *args):
+        self.data.clear()
+        self.expires.clear()
+        return b'OK'
+
+
+def encode(reply):
+    if reply is None:
+        return b'$-1\r\n'
+    if isinstance(reply, RedisError):
+        return b'-' + str(reply).encode() + b'\r\n'
+    if isinstance(reply, int):
+        return b':%d\r\n' % reply
+    if isinstance(reply, list):
+        return b'*%d\r\n' % len(reply) + b''.join(map(encode, reply))
+    if reply in (b'OK', b'PONG'):
+        return b'+' + reply + b'\r\n'
+    return b'$%d\r\n%s\r\n' % (len(reply), reply)
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def handle(self):
+        while True:
+            command = self.read_command()
+            if not command:
+                return
+            try:
+                reply = self.server.storage.execute(*command)
+            except RedisError as error:
+                reply = error
+            self.wfile.write(encode(reply))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), Handler)
+        self.storage = Storage()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f'redis://{host}:{port}/0'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
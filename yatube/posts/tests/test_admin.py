@@ -0,0 +1,75 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Post, User, UserStats
+
+
+class AdminTest(TestCase):
+    """Списки админки не перебирают таблицы целиком."""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create(
+            username='Admin', is_staff=True, is_superuser=True)
+        cls.author = User.objects.create(username='Author')
+        cls.post = Post.objects.create(text='Text', author=cls.author)
+        cls.other = Post.objects.create(text='Other', author=cls.admin)
+        Comment.objects.bulk_create(
+            [Comment(text=f'Comment {i}', author=cls.author, post=cls.post)
+             for i in range(5)]
+            + [Comment(text='Admin comment', author=cls.admin,
+                       post=cls.other)])
+        Post.objects.filter(id=cls.post.id).update(comment_count=5)
+        Post.objects.filter(id=cls.other.id).update(comment_count=1)
+        UserStats.objects.create(user=cls.author, posts_count=1)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(AdminTest.admin)
+        self.url = reverse('admin:posts_comment_changelist')
+
+    def test_input_filters(self):
+        response = self.client.get(self.url, {'author': 'Admin'})
+        self.assertEqual(
+            [comment.text for comment in response.context['cl'].result_list],
+            ['Admin comment'])
+        response = self.client.get(self.url, {'post': AdminTest.post.id})
+        self.assertEqual(response.context['cl'].result_count, 5)
+        response = self.client.get(self.url, {'post': 'abc'})
+        self.assertEqual(response.context['cl'].result_count, 0)
+
+    def test_count_without_filters_is_estimated(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['cl'].result_count,
+                         Comment.objects.latest('id').id)
+
+    @override_settings(ADMIN_BATCH_SIZE=2)
+    def test_delete_in_batches(self):
+        response = self.client.post(self.url + f'?post={AdminTest.post.id}', {
+            'action': 'delete_in_batches', 'select_across': 1,
+            '_selected_action': [AdminTest.post.comments.first().id]})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(AdminTest.post.comments.exists())
+        self.assertTrue(AdminTest.other.comments.exists())
+        comment_counts = dict(Post.objects.values_list('id', 'comment_count'))
+        self.assertEqual(comment_counts, {AdminTest.post.id: 0,
+                                          AdminTest.other.id: 1})
+
+    def test_post_delete_updates_author_stats(self):
+        url = reverse('admin:posts_post_delete', args=(AdminTest.post.id,))
+        response = self.client.post(url, {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Post.objects.filter(id=AdminTest.post.id).exists())
+        self.assertEqual(
+            UserStats.objects.get(user=AdminTest.author).posts_count, 0)
+
+    def test_add_updates_counters(self):
+        self.client.post(reverse('admin:posts_post_add'), {
+            'text': 'Admin post', 'author': AdminTest.author.id})
+        self.assertEqual(
+            UserStats.objects.get(user=AdminTest.author).posts_count, 2)
+        self.client.post(reverse('admin:posts_comment_add'), {
+            'text': 'Admin comment', 'author': AdminTest.admin.id,
+            'post': AdminTest.other.id})
+        AdminTest.other.refresh_from_db()
+        self.assertEqual(AdminTest.other.comment_count, 2)
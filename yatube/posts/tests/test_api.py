@@ -0,0 +1,73 @@
+import json
+
+from django.test import Client, TestCase
+from django.urls import reverse
+from yatube.settings import POSTS_ON_PAGE
+from ..models import Follow, Group, Post, User
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='Author')
+        cls.reader = User.objects.create(username='Reader')
+        cls.group = Group.objects.create(
+            title='Group', slug='group', description='Description')
+        Post.objects.bulk_create([
+            Post(text=f'Text {i}', author=cls.author, group=cls.group)
+            for i in range(POSTS_ON_PAGE + 3)])
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.client = Client()
+
+    def get_json(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return response, json.loads(b''.join(response.streaming_content)
+                                    if response.streaming
+                                    else response.content)
+
+    def test_feeds_paginate_with_cursor(self):
+        self.client.force_login(ApiTest.reader)
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group', kwargs={'slug': 'group'}),
+            reverse('posts:api_profile', kwargs={'username': 'Author'}),
+            reverse('posts:api_follow_index'),
+        )
+        newest = list(Post.objects.values_list('id', flat=True))
+        for url in urls:
+            with self.subTest(url=url):
+                _, data = self.get_json(url)
+                self.assertEqual([post['id'] for post in data['results']],
+                                 newest[:POSTS_ON_PAGE])
+                self.assertIsNone(data['previous'])
+                self.assertEqual(data['results'][0]['author'], 'Author')
+                self.assertEqual(data['results'][0]['group'], 'group')
+                _, data = self.get_json(data['next'])
+                self.assertEqual([post['id'] for post in data['results']],
+                                 newest[POSTS_ON_PAGE:])
+                self.assertIsNone(data['next'])
+                self.assertIsNotNone(data['previous'])
+
+    def test_field_selection_and_single_query(self):
+        with self.assertNumQueries(1):
+            _, data = self.get_json(reverse('posts:api_index'),
+                                    fields='id,text', limit=2)
+        self.assertEqual(len(data['results']), 2)
+        self.assertEqual(set(data['results'][0]), {'id', 'text'})
+
+    def test_errors(self):
+        cases = (
+            (reverse('posts:api_index'), {'fields': 'password'}, 400),
+            (reverse('posts:api_index'), {'limit': '1000'}, 400),
+            (reverse('posts:api_group', kwargs={'slug': 'none'}), {}, 404),
+            (reverse('posts:api_follow_index'), {}, 401),
+        )
+        for url, params, status in cases:
+            with self.subTest(url=url, params=params):
+                response, data = self.get_json(url, **params)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('detail', data)
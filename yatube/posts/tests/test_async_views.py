@@ -0,0 +1,74 @@
+from asyncio import iscoroutinefunction
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from .. import views
+from ..models import Follow, Group, Post, User
+
+
+class AsyncViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='Author')
+        cls.reader = User.objects.create(username='Reader')
+        cls.group = Group.objects.create(
+            title='Group', slug='group', description='Description')
+        cls.post = Post.objects.create(
+            text='Test text', author=cls.author, group=cls.group)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group', kwargs={'slug': 'group'}),
+            reverse('posts:profile', kwargs={'username': 'Author'}),
+            reverse('posts:post', kwargs={
+                'username': 'Author', 'post_id': cls.post.id}),
+        )
+
+    def setUp(self):
+        self.client = AsyncClient()
+        cache.clear()
+
+    def test_read_views_are_coroutines(self):
+        for view in (views.index, views.group_posts, views.profile,
+                     views.post_view, views.follow_index):
+            with self.subTest(view=view.__name__):
+                self.assertTrue(iscoroutinefunction(view))
+
+    async def test_pages_render_and_revalidate(self):
+        for url in AsyncViewsTest.urls:
+            with self.subTest(url=url):
+                response = await self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Test text')
+                response = await self.client.get(
+                    url, IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+
+    async def test_missing_objects_return_404(self):
+        for url in (reverse('posts:group', kwargs={'slug': 'missing'}),
+                    reverse('posts:profile', kwargs={'username': 'nobody'}),
+                    reverse('posts:post', kwargs={
+                        'username': 'Author', 'post_id': 0})):
+            with self.subTest(url=url):
+                response = await self.client.get(url)
+                self.assertEqual(response.status_code, 404)
+
+    async def test_follow_index_requires_login(self):
+        url = reverse('posts:follow_index')
+        response = await self.client.get(url)
+        self.assertRedirects(
+            response, f'/auth/login/?next={url}',
+            fetch_redirect_response=False)
+        await sync_to_async(self.client.force_login)(AsyncViewsTest.reader)
+        response = await self.client.get(url)
+        self.assertContains(response, 'Test text')
+
+    def test_index_is_served_from_feed_cache(self):
+        get = async_to_sync(self.client.get)
+        get(reverse('posts:index'))
+        with self.assertNumQueries(0):
+            response = get(reverse('posts:index'))
+        self.assertContains(response, 'Test text')
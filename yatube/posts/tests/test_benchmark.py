@@ -0,0 +1,42 @@
+from django.test import Client, TestCase
+from ..benchmark import ADMIN_PAGES, BUDGETS, measure, over_budget, seed
+
+
+class QueryBudgetTest(TestCase):
+    """Число запросов страниц в бюджете и не растёт вместе с данными."""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.data = seed(users=20, posts=60, comments=120, follows=40)
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(QueryBudgetTest.data.reader)
+        self.admin_client = Client()
+        self.admin_client.force_login(QueryBudgetTest.data.admin)
+
+    def measure_all(self):
+        results = {}
+        for name, url in QueryBudgetTest.data.urls().items():
+            client = (self.admin_client if name in ADMIN_PAGES
+                      else self.reader_client)
+            results[name] = measure(client, url, repeat=1)
+        return results
+
+    def test_pages_fit_query_budget(self):
+        results = self.measure_all()
+        self.assertEqual(set(results), set(BUDGETS))
+        for name, result in results.items():
+            with self.subTest(page=name):
+                self.assertEqual(result['status'], 200)
+                self.assertEqual(
+                    over_budget(name, result, metrics=('queries',)), [])
+
+    def test_queries_do_not_grow_with_data(self):
+        before = self.measure_all()
+        seed(users=20, posts=120, comments=240, follows=80, seed=1)
+        after = self.measure_all()
+        for name in BUDGETS:
+            with self.subTest(page=name):
+                self.assertEqual(
+                    after[name]['queries'], before[name]['queries'])
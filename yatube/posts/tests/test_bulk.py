@@ -0,0 +1,111 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+from ..models import Comment, Follow, Group, Post, User, UserStats
+
+TEST_DIR = tempfile.mkdtemp()
+
+
+class BulkContentTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='Author')
+        cls.reader = User.objects.create(username='Reader')
+        cls.group = Group.objects.create(
+            title='Group', slug='group', description='Description')
+        cls.posts = [Post.objects.create(
+            text=f'Пост {i}, "с кавычками"\nи переводом строки',
+            author=cls.author, group=cls.group if i % 2 else None)
+            for i in range(5)]
+        cls.pub_date = timezone.now() - timedelta(days=30)
+        Post.objects.update(pub_date=cls.pub_date)
+        Comment.objects.create(
+            text='Comment', author=cls.reader, post=cls.posts[0])
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def export(self, kind, fmt, **options):
+        path = os.path.join(TEST_DIR, f'{kind}.{fmt}')
+        call_command('export_content', kind, output=path, batch_size=2,
+                     stdout=StringIO(), **options)
+        return path
+
+    def load(self, kind, path, **options):
+        call_command('import_content', kind, path, batch_size=2,
+                     stdout=StringIO(), **options)
+
+    def test_round_trip(self):
+        for fmt in ('jsonl', 'csv'):
+            with self.subTest(fmt=fmt):
+                paths = {kind: self.export(kind, fmt) for kind in (
+                    'groups', 'posts', 'comments', 'follows')}
+                Post.objects.all().delete()
+                Group.objects.all().delete()
+                Follow.objects.all().delete()
+                User.objects.filter(username='Reader').delete()
+                for kind, path in paths.items():
+                    self.load(kind, path)
+                self.assertEqual(Post.objects.count(), 5)
+                post = Post.objects.get(id=BulkContentTest.posts[0].id)
+                self.assertEqual(post.text, BulkContentTest.posts[0].text)
+                self.assertEqual(post.pub_date, BulkContentTest.pub_date)
+                self.assertEqual(post.comment_count, 1)
+                self.assertEqual(
+                    Post.objects.filter(group__slug='group').count(), 2)
+                self.assertTrue(Follow.objects.filter(
+                    user__username='Reader', author__username='Author'
+                ).exists())
+                self.assertEqual(UserStats.objects.get(
+                    user__username='Author').followers_count, 1)
+
+    def test_import_resumes_from_checkpoint(self):
+        path = self.export('posts', 'jsonl')
+        Post.objects.all().delete()
+        with open(f'{path}.checkpoint', 'w') as file:
+            json.dump({'rows': 3}, file)
+        self.load('posts', path, skip_rebuild=True)
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+    def test_import_refuses_taken_ids(self):
+        path = self.export('posts', 'jsonl')
+        with self.assertRaisesMessage(CommandError, '--force'):
+            self.load('posts', path, skip_rebuild=True)
+        Post.objects.exclude(id=BulkContentTest.posts[0].id).delete()
+        with self.assertRaisesMessage(
+                CommandError, f'id {BulkContentTest.posts[0].id} '):
+            self.load('posts', path, skip_rebuild=True, force=True)
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_export_resumes_and_drops_partial_tail(self):
+        path = self.export('posts', 'jsonl')
+        with open(path, encoding='utf-8') as file:
+            lines = file.readlines()
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write('{"id": 1, "tex')
+        with open(f'{path}.checkpoint', 'w') as file:
+            json.dump({'after_id': json.loads(lines[1])['id'],
+                       'offset': len(''.join(lines[:2]).encode()),
+                       'rows': 2}, file)
+        self.export('posts', 'jsonl')
+        with open(path, encoding='utf-8') as file:
+            self.assertEqual(file.readlines(), lines)
+
+    def test_export_to_stdout(self):
+        out = StringIO()
+        call_command('export_content', 'follows', format='csv', stdout=out)
+        self.assertEqual(out.getvalue().splitlines(),
+                         ['id,user,author', f'{Follow.objects.get().id},'
+                          'Reader,Author'])
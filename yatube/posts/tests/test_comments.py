@@ -0,0 +1,59 @@
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from yatube.settings import COMMENTS_ON_PAGE
+
+from ..models import Comment, Post, User
+
+
+class CommentPagesTest(TestCase):
+    """Комментарии отдаются пачками по курсору, а не все сразу."""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='Author')
+        cls.post = Post.objects.create(text='Text', author=cls.author)
+        Comment.objects.bulk_create([
+            Comment(text=f'Comment {i}', author=cls.author, post=cls.post)
+            for i in range(COMMENTS_ON_PAGE + 5)])
+        cls.post_url = reverse('posts:post', kwargs={
+            'username': 'Author', 'post_id': cls.post.id})
+        cls.fragment_url = reverse('posts:comments', kwargs={
+            'username': 'Author', 'post_id': cls.post.id})
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def test_first_batch_on_post_page(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(CommentPagesTest.post_url)
+        page = response.context['comments']
+        self.assertEqual(len(page.object_list), COMMENTS_ON_PAGE)
+        self.assertEqual(page.object_list[0].text,
+                         f'Comment {COMMENTS_ON_PAGE + 4}')
+        self.assertContains(response, page.paginator.next_cursor)
+
+    def test_fragment_continues_from_cursor(self):
+        page = self.client.get(CommentPagesTest.post_url).context['comments']
+        response = self.client.get(CommentPagesTest.fragment_url, {
+            'cursor': page.paginator.next_cursor})
+        self.assertEqual(
+            [comment.text for comment in response.context['comments']],
+            [f'Comment {i}' for i in range(4, -1, -1)])
+        self.assertNotContains(response, 'Показать ещё')
+        self.assertNotContains(response, '<html')
+
+    def test_json_batches(self):
+        url = reverse('posts:api_comments',
+                      kwargs={'post_id': CommentPagesTest.post.id})
+        response = self.client.get(url, {'limit': 3, 'fields': 'text,author'})
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(data['results'][0], {
+            'text': f'Comment {COMMENTS_ON_PAGE + 4}', 'author': 'Author'})
+        self.assertEqual(len(data['results']), 3)
+        self.assertIsNotNone(data['next'])
+        missing = reverse('posts:api_comments', kwargs={'post_id': 0})
+        self.assertEqual(self.client.get(missing).status_code, 404)
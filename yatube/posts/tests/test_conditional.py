@@ -0,0 +1,124 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from ..models import Group, Post, User
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='Author')
+        cls.reader = User.objects.create(username='Reader')
+        cls.group = Group.objects.create(
+            title='Group', slug='group', description='Description')
+        cls.post = Post.objects.create(
+            text='Test text', author=cls.author, group=cls.group)
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group', kwargs={'slug': 'group'}),
+            reverse('posts:profile', kwargs={'username': 'Author'}),
+            reverse('posts:post', kwargs={
+                'username': 'Author', 'post_id': cls.post.id}),
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(ConditionalGetTest.reader)
+        # Страница поста ставит cookie csrftoken, от неё тоже зависит ETag.
+        self.client.get(ConditionalGetTest.urls[-1])
+        cache.clear()
+
+    def revalidate(self, url, client=None):
+        client = client or self.client
+        etag = client.get(url)['ETag']
+        return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_return_304(self):
+        for url in ConditionalGetTest.urls:
+            with self.subTest(url=url):
+                response = self.revalidate(url)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    def test_changes_invalidate_etag(self):
+        etags = {url: self.client.get(url)['ETag']
+                 for url in ConditionalGetTest.urls}
+        self.client.post(
+            reverse('posts:add_comment', kwargs={
+                'username': 'Author', 'post_id': ConditionalGetTest.post.id}),
+            data={'text': 'Comment'})
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_changes_elsewhere_keep_etag(self):
+        other = User.objects.create(username='Other')
+        other_post = Post.objects.create(text='Other text', author=other)
+        etags = {url: self.client.get(url)['ETag']
+                 for url in ConditionalGetTest.urls}
+        self.client.post(
+            reverse('posts:add_comment', kwargs={
+                'username': 'Other', 'post_id': other_post.id}),
+            data={'text': 'Comment'})
+        third_client = Client()
+        third_client.force_login(User.objects.create(username='Third'))
+        third_client.get(reverse('posts:profile_follow',
+                                 kwargs={'username': 'Other'}))
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                expected = 200 if url == ConditionalGetTest.urls[0] else 304
+                self.assertEqual(response.status_code, expected)
+
+    def test_follow_invalidates_profile(self):
+        url = reverse('posts:profile', kwargs={'username': 'Author'})
+        etag = self.client.get(url)['ETag']
+        self.client.get(reverse('posts:profile_follow',
+                                kwargs={'username': 'Author'}))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_display_fields_invalidate_etag(self):
+        group, author = ConditionalGetTest.group, ConditionalGetTest.author
+        index, group_url = ConditionalGetTest.urls[:2]
+        etags = {url: self.client.get(url)['ETag']
+                 for url in (index, group_url)}
+        with self.captureOnCommitCallbacks(execute=True):
+            group.title = 'Renamed group'
+            group.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Renamed group')
+        etag = self.client.get(index)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            author.username = 'RenamedAuthor'
+            author.save()
+        response = self.client.get(index, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'RenamedAuthor')
+
+    def test_login_keeps_etag(self):
+        url = ConditionalGetTest.urls[0]
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            ConditionalGetTest.author.save(update_fields=['last_login'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_depends_on_viewer(self):
+        author_client = Client()
+        author_client.force_login(ConditionalGetTest.author)
+        for url in ConditionalGetTest.urls:
+            with self.subTest(url=url):
+                self.assertNotEqual(self.client.get(url)['ETag'],
+                                    author_client.get(url)['ETag'])
+
+    def test_post_last_modified(self):
+        url = ConditionalGetTest.urls[-1]
+        last_modified = Client().get(url)['Last-Modified']
+        response = Client().get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,99 @@
+from importlib import import_module
+from io import StringIO
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ..models import Comment, Follow, Post, User, UserStats
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='Author')
+        cls.reader = User.objects.create(username='Reader')
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(CountersTest.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(CountersTest.reader)
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_views_keep_counters(self):
+        self.author_client.post(reverse('posts:new_post'),
+                                data={'text': 'Test text'})
+        self.assertEqual(self.stats(CountersTest.author).posts_count, 1)
+
+        post = Post.objects.get()
+        self.reader_client.post(
+            reverse('posts:add_comment', kwargs={
+                'username': 'Author', 'post_id': post.id}),
+            data={'text': 'Comment'})
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+
+        follow_url = reverse('posts:profile_follow',
+                             kwargs={'username': 'Author'})
+        for _ in range(2):
+            self.reader_client.get(follow_url)
+        self.assertEqual(self.stats(CountersTest.author).followers_count, 1)
+        self.assertEqual(self.stats(CountersTest.reader).following_count, 1)
+
+        self.reader_client.get(reverse('posts:profile_unfollow',
+                                       kwargs={'username': 'Author'}))
+        self.assertEqual(self.stats(CountersTest.author).followers_count, 0)
+        self.assertEqual(self.stats(CountersTest.reader).following_count, 0)
+
+    def test_profile_pages_by_stored_count(self):
+        for i in range(3):
+            self.author_client.post(reverse('posts:new_post'),
+                                    data={'text': f'Post {i}'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.reader_client.get(
+                reverse('posts:profile', kwargs={'username': 'Author'}))
+        self.assertEqual(response.context['page'].paginator.count, 3)
+        self.assertFalse([query for query in queries
+                          if 'COUNT(' in query['sql'].upper()])
+
+    def test_rebuild_counters(self):
+        post = Post.objects.create(text='Test text',
+                                   author=CountersTest.author)
+        Comment.objects.create(text='Comment', author=CountersTest.reader,
+                               post=post)
+        Follow.objects.create(user=CountersTest.reader,
+                              author=CountersTest.author)
+
+        call_command('rebuild_counters', stdout=StringIO())
+
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+        author_stats = self.stats(CountersTest.author)
+        self.assertEqual(author_stats.posts_count, 1)
+        self.assertEqual(author_stats.followers_count, 1)
+        self.assertEqual(self.stats(CountersTest.reader).following_count, 1)
+
+    def test_unfollow_before_counters_stays_at_zero(self):
+        # Подписка старше счётчиков: отписка не уводит их в минус.
+        Follow.objects.create(user=CountersTest.reader,
+                              author=CountersTest.author)
+        self.reader_client.get(reverse('posts:profile_unfollow',
+                                       kwargs={'username': 'Author'}))
+        self.assertEqual(self.stats(CountersTest.author).followers_count, 0)
+        self.assertEqual(self.stats(CountersTest.reader).following_count, 0)
+
+    def test_migration_backfills_counters(self):
+        Post.objects.create(text='Test text', author=CountersTest.author)
+        Follow.objects.create(user=CountersTest.reader,
+                              author=CountersTest.author)
+        migration = import_module('posts.migrations.0015_backfill_counters')
+        migration.backfill_counters(apps, None)
+        author_stats = self.stats(CountersTest.author)
+        self.assertEqual(author_stats.posts_count, 1)
+        self.assertEqual(author_stats.followers_count, 1)
+        self.assertEqual(self.stats(CountersTest.reader).following_count, 1)
@@ -0,0 +1,39 @@
+import tempfile
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase
+from yatube.database import check_connection
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Профиль SQLite')
+class DatabaseProfileTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.database = DatabaseWrapper({
+            **connection.settings_dict,
+            'NAME': str(Path(directory.name) / 'db.sqlite3'),
+            'CONN_HEALTH_CHECKS': True})
+        self.addCleanup(self.database.close)
+
+    def pragma(self, name):
+        with self.database.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_on_new_connection(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        # 1 - NORMAL.
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+
+    def test_broken_connection_is_closed(self):
+        self.database.ensure_connection()
+        check_connection(self.database)
+        self.assertIsNotNone(self.database.connection)
+        with mock.patch.object(self.database, 'is_usable', return_value=False):
+            check_connection(self.database)
+        self.assertIsNone(self.database.connection)
@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from ..feed_cache import bump_feed_generation, feed_generation
+from ..models import Post, User
+
+
+class FeedCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='User')
+        cls.post = Post.objects.create(text='Test text', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(FeedCacheTest.user)
+
+    def test_index_cached_until_generation_changes(self):
+        url = reverse('posts:index')
+        content = self.client.get(url).content
+        Post.objects.create(text='Silent post', author=FeedCacheTest.user)
+        self.assertEqual(content, self.client.get(url).content)
+        bump_feed_generation()
+        self.assertNotEqual(content, self.client.get(url).content)
+
+    def test_views_bump_generation(self):
+        post_kwargs = {'username': 'User', 'post_id': FeedCacheTest.post.id}
+        requests = {
+            reverse('posts:new_post'): {'text': 'New post'},
+            reverse('posts:post_edit', kwargs=post_kwargs): {
+                'text': 'Edited'},
+            reverse('posts:add_comment', kwargs=post_kwargs): {
+                'text': 'Comment'},
+        }
+        for url, data in requests.items():
+            with self.subTest(url=url):
+                generation = feed_generation()
+                self.client.post(url, data=data)
+                self.assertGreater(feed_generation(), generation)
+
+    def test_index_not_shared_between_users(self):
+        url = reverse('posts:index')
+        self.client.get(url)
+        other = User.objects.create(username='Other')
+        other_client = Client()
+        other_client.force_login(other)
+        self.assertContains(other_client.get(url), 'Пользователь: Other')
@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import follow_graph
+from ..models import Follow, User
+
+
+class FollowGraphTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader, cls.friend, cls.author, cls.other = (
+            User.objects.create(username=name)
+            for name in ('Reader', 'Friend', 'Author', 'Other'))
+        Follow.objects.create(user=cls.reader, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.reader)
+        Follow.objects.create(user=cls.friend, author=cls.author)
+        Follow.objects.create(user=cls.friend, author=cls.other)
+        Follow.objects.create(user=cls.other, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(FollowGraphTest.reader)
+
+    def test_lookups_are_cached(self):
+        reader = FollowGraphTest.reader
+        friend = FollowGraphTest.friend
+        self.assertTrue(follow_graph.is_following(reader.id, friend.id))
+        with self.assertNumQueries(1):
+            self.assertEqual(follow_graph.mutual_ids(reader.id), {friend.id})
+        with self.assertNumQueries(0):
+            self.assertFalse(follow_graph.is_following(
+                reader.id, FollowGraphTest.author.id))
+            self.assertFalse(follow_graph.is_following(None, friend.id))
+
+    def test_follow_and_unfollow_update_graph(self):
+        reader = FollowGraphTest.reader
+        author = FollowGraphTest.author
+        self.assertNotIn(reader.id, follow_graph.follower_ids(author.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('posts:profile_follow',
+                                    kwargs={'username': 'Author'}))
+        self.assertTrue(follow_graph.is_following(reader.id, author.id))
+        self.assertIn(reader.id, follow_graph.follower_ids(author.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('posts:profile_unfollow',
+                                    kwargs={'username': 'Author'}))
+        self.assertFalse(follow_graph.is_following(reader.id, author.id))
+
+    def test_reset_drops_bulk_changes(self):
+        reader = FollowGraphTest.reader
+        self.assertEqual(follow_graph.following_ids(reader.id),
+                         {FollowGraphTest.friend.id})
+        Follow.objects.bulk_create(
+            [Follow(user=reader, author=FollowGraphTest.other)])
+        follow_graph.reset()
+        self.assertIn(FollowGraphTest.other.id,
+                      follow_graph.following_ids(reader.id))
+
+    def test_suggestions_from_second_degree(self):
+        # Author и Other читает Friend, Author ещё и Other.
+        self.assertEqual(
+            follow_graph.suggestions(FollowGraphTest.reader.id),
+            [FollowGraphTest.author.id, FollowGraphTest.other.id])
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            [user.username for user in response.context['suggestions']],
+            ['Author', 'Other'])
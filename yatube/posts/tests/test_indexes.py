@@ -0,0 +1,53 @@
+from unittest import skipUnless
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN есть в SQLite')
+class IndexesTest(TestCase):
+    """Горячие выборки идут по индексу и без отдельной сортировки."""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='Author')
+        cls.reader = User.objects.create(username='Reader')
+        cls.group = Group.objects.create(
+            title='Group', slug='group', description='Description')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Text')
+
+    def assertUsesIndex(self, queryset, index=None):
+        plan = queryset.explain()
+        self.assertIn('USING', plan)
+        self.assertNotIn('SCAN', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        if index:
+            self.assertIn(index, plan)
+
+    def test_feed_lookups(self):
+        self.assertUsesIndex(
+            Post.objects.filter(author=IndexesTest.author)[:10],
+            'post_author_id_idx')
+        self.assertUsesIndex(
+            Post.objects.filter(group=IndexesTest.group)[:10],
+            'post_group_id_idx')
+        self.assertUsesIndex(
+            Post.objects.filter(author=IndexesTest.author,
+                                id__lt=IndexesTest.post.id)[:10],
+            'post_author_id_idx')
+        self.assertUsesIndex(Comment.objects.filter(post=IndexesTest.post),
+                             'comment_post_id_idx')
+
+    def test_follow_lookup(self):
+        self.assertUsesIndex(Follow.objects.filter(
+            user=IndexesTest.reader, author=IndexesTest.author))
+
+    def test_follow_is_unique(self):
+        Follow.objects.create(user=IndexesTest.reader,
+                              author=IndexesTest.author)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(user=IndexesTest.reader,
+                                  author=IndexesTest.author)
@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from ..models import Post, User
+
+
+class MetricsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='User')
+        Post.objects.create(text='Test text', author=cls.user)
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def test_server_timing(self):
+        timing = self.client.get(reverse('posts:index'))['Server-Timing']
+        self.assertIn('total;dur=', timing)
+        self.assertIn('db;dur=', timing)
+        self.assertIn('template;dur=', timing)
+        self.assertNotIn(' 0 misses', timing)
+        # Вторая выдача страницы - из кэша ленты.
+        timing = self.client.get(reverse('posts:index'))['Server-Timing']
+        self.assertIn('desc="0 queries"', timing)
+        self.assertIn(' 0 misses', timing)
+
+    @override_settings(METRICS_ALLOWED_IPS=['127.0.0.1'])
+    def test_prometheus_endpoint(self):
+        self.client.get(reverse('posts:profile', kwargs={'username': 'User'}))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn(
+            'yatube_requests_total{view="posts:profile",status="200"}', text)
+        self.assertIn('yatube_request_duration_seconds_bucket'
+                      '{view="posts:profile",le="+Inf"}', text)
+        self.assertIn('yatube_db_queries_total{view="posts:profile"}', text)
+
+    def test_endpoint_is_disabled_by_default(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_ALLOWED_IPS=['127.0.0.1'])
+    def test_endpoint_is_private(self):
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_logged_with_sql(self):
+        with self.assertLogs('yatube.metrics', 'WARNING') as logs:
+            self.client.get(reverse('posts:group', kwargs={'slug': 'none'}))
+        self.assertIn('posts:group', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    async def test_async_server_timing(self):
+        # Под ASGI view работает в отдельном потоке, SQL всё равно учтён.
+        response = await self.async_client.get(reverse('posts:index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertNotIn('"0 queries"', response['Server-Timing'])
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from yatube.settings import POSTS_ON_PAGE
+from ..models import Post, User
+from ..paginators import CursorPaginator, decode_cursor
+
+
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='User')
+        Post.objects.bulk_create([
+            Post(text=f'Test text {i}', author=cls.user)
+            for i in range(POSTS_ON_PAGE * 2 + 3)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def paginator(self):
+        return CursorPaginator(Post.objects.all(), POSTS_ON_PAGE)
+
+    def test_walk_forward_and_back(self):
+        ids = list(Post.objects.values_list('id', flat=True))
+        first = self.paginator()
+        page = first.get_page(None)
+        self.assertEqual([post.id for post in page], ids[:POSTS_ON_PAGE])
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+
+        second = self.paginator()
+        page = second.get_page(first.next_cursor)
+        self.assertEqual([post.id for post in page],
+                         ids[POSTS_ON_PAGE:POSTS_ON_PAGE * 2])
+        self.assertTrue(page.has_previous())
+
+        last = self.paginator()
+        page = last.get_page(second.next_cursor)
+        self.assertEqual([post.id for post in page],
+                         ids[POSTS_ON_PAGE * 2:])
+        self.assertFalse(page.has_next())
+
+        back = self.paginator()
+        page = back.get_page(last.previous_cursor)
+        self.assertEqual([post.id for post in page],
+                         ids[POSTS_ON_PAGE:POSTS_ON_PAGE * 2])
+        self.assertTrue(page.has_next())
+
+    def test_broken_cursor_gives_first_page(self):
+        for cursor in ('', 'zzz', '!!', 'eDE'):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(decode_cursor(cursor), (None, None))
+                page = self.paginator().get_page(cursor)
+                self.assertEqual(page[0], Post.objects.first())
+
+    def test_deep_page_without_count(self):
+        paginator = self.paginator()
+        page = paginator.get_page(None)
+        client = Client()
+        url = reverse('posts:index')
+        with self.assertNumQueries(1):
+            response = client.get(
+                f'{url}?{paginator.cursor_param}={paginator.next_cursor}')
+        self.assertEqual(response.context['page'][0],
+                         Post.objects.all()[POSTS_ON_PAGE])
+        self.assertContains(response, '?cursor=')
+        self.assertEqual(len(page), POSTS_ON_PAGE)
@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from ..models import Group, Post, User
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='User')
+        cls.group = Group.objects.create(
+            title='Test group', description='Test description',
+            slug='test_group')
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Old text', author=PostCardCacheTest.user,
+            group=PostCardCacheTest.group)
+
+    def test_card_shared_between_feeds(self):
+        Client().get(reverse('posts:index'))
+        # обход save(): ключ карточки не меняется, HTML берётся из кэша
+        Post.objects.filter(id=self.post.id).update(text='Silent text')
+        response = Client().get(
+            reverse('posts:profile', kwargs={'username': 'User'}))
+        self.assertContains(response, 'Old text')
+
+    def test_card_invalidated_on_changes(self):
+        url = reverse('posts:profile', kwargs={'username': 'User'})
+        Client().get(url)
+        self.post.text = 'New text'
+        self.post.save()
+        self.assertContains(Client().get(url), 'New text')
+
+        Post.objects.filter(id=self.post.id).update(comment_count=3)
+        self.assertContains(Client().get(url), 'Комментариев: 3')
+
+        PostCardCacheTest.group.title = 'Renamed group'
+        PostCardCacheTest.group.save()
+        self.assertContains(Client().get(url), 'Renamed group')
+
+    def test_edit_link_only_for_author(self):
+        url = reverse('posts:post', kwargs={
+            'username': 'User', 'post_id': self.post.id})
+        edit_url = reverse('posts:post_edit', kwargs={
+            'username': 'User', 'post_id': self.post.id})
+        author = Client()
+        author.force_login(PostCardCacheTest.user)
+        self.assertContains(author.get(url), edit_url)
+        reader = Client()
+        reader.force_login(User.objects.create(username='Reader'))
+        self.assertNotContains(reader.get(url), edit_url)
@@ -0,0 +1,59 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import rendering
+from ..models import Post, User
+
+TEXT = ('Первый абзац со ссылкой https://example.com и <b>тегом</b>.\n\n'
+        + ' '.join(f'слово{i}' for i in range(40)))
+
+
+class RenderingTest(TestCase):
+    """HTML поста готовится при сохранении и совпадает с прежним шаблоном."""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='Author')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_same_html_as_template_filters(self):
+        full, excerpt = rendering.render_text(TEXT)
+        context = Context({'text': TEXT})
+        self.assertEqual(full, Template(
+            '{{ text|linebreaks|urlize }}').render(context))
+        self.assertEqual(excerpt, Template(
+            '{{ text|linebreaks|truncatewords:30|urlize }}').render(context))
+        self.assertIn('href="https://example.com"', full)
+        self.assertIn('&lt;b&gt;', full)
+
+    def test_save_renders_text(self):
+        post = Post.objects.create(text=TEXT, author=RenderingTest.author)
+        self.assertEqual(post.render_version, rendering.RENDER_VERSION)
+        post.text = 'Новый текст'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p>Новый текст</p>')
+
+    def test_cards_show_stored_html(self):
+        post = Post.objects.create(text=TEXT, author=RenderingTest.author)
+        Post.objects.filter(id=post.id).update(
+            excerpt_html='<p>Готовый анонс</p>')
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, '<p>Готовый анонс</p>')
+
+    def test_command_renders_outdated_posts(self):
+        Post.objects.bulk_create(
+            [Post(text=TEXT, author=RenderingTest.author)])
+        out = StringIO()
+        call_command('rerender_posts', stdout=out)
+        self.assertIn('1', out.getvalue())
+        post = Post.objects.get()
+        self.assertEqual(post.render_version, rendering.RENDER_VERSION)
+        self.assertEqual(post.excerpt_html, rendering.render_text(TEXT)[1])
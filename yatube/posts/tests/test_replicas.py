@@ -0,0 +1,71 @@
+from time import time
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from yatube.db_router import (STICKY_COOKIE, ReplicaMiddleware,
+                              ReplicaRouter, read_from_replica)
+
+from ..feed_cache import FEED_CHANGED_KEY, bump_feed_generation
+from ..models import Post
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_STICKY_SECONDS=15)
+class ReplicaRouterTest(SimpleTestCase):
+    """Чтение с реплики только в помеченных view и не после записи."""
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        self.used = []
+        # Лента давно не менялась, реплики успели её получить.
+        cache.set(FEED_CHANGED_KEY, int(time()) - 60, None)
+
+    def view(self, write=False):
+        def view(request):
+            self.used.append(self.router.db_for_read(Post))
+            if write:
+                self.router.db_for_write(Post)
+                self.used.append(self.router.db_for_read(Post))
+            return HttpResponse()
+        return view
+
+    def call(self, view, **cookies):
+        request = self.factory.get('/')
+        request.COOKIES.update(cookies)
+        return ReplicaMiddleware(view)(request)
+
+    def test_marked_views_read_from_replica(self):
+        self.call(read_from_replica(self.view()))
+        self.call(self.view())
+        self.assertEqual(self.used, ['replica1', 'default'])
+
+    def test_write_pins_reads_to_primary(self):
+        response = self.call(read_from_replica(self.view(write=True)))
+        self.assertEqual(self.used, ['replica1', 'default'])
+        cookie = response.cookies[STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], 15)
+        self.call(read_from_replica(self.view()), **{STICKY_COOKIE: '1'})
+        self.assertEqual(self.used[-1], 'default')
+
+    def test_async_views_read_from_replica(self):
+        async def view(request):
+            self.used.append(self.router.db_for_read(Post))
+            return HttpResponse()
+        middleware = ReplicaMiddleware(read_from_replica(view))
+        async_to_sync(middleware)(self.factory.get('/'))
+        self.assertEqual(self.used, ['replica1'])
+
+    def test_feed_change_pins_everyone_to_primary(self):
+        bump_feed_generation()
+        self.call(read_from_replica(self.view()))
+        self.assertEqual(self.used, ['default'])
+
+    def test_reads_without_writes_set_no_cookie(self):
+        response = self.call(read_from_replica(self.view()))
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_writes_and_migrations_stay_on_primary(self):
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
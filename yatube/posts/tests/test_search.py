@@ -0,0 +1,59 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from .. import search
+from ..models import Comment, Post, User
+from ..stemmer import stem
+
+
+class StemmerTest(TestCase):
+    def test_word_forms_share_stem(self):
+        forms = (
+            ('кошка', 'кошки', 'кошками'),
+            ('вечерний', 'вечерняя', 'вечерние'),
+            ('подписчик', 'подписчиков', 'подписчикам'),
+        )
+        for words in forms:
+            with self.subTest(words=words):
+                self.assertEqual(len({stem(word) for word in words}), 1)
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='User')
+        cls.cats = Post.objects.create(
+            text='Кошки любят рыбу', author=cls.user)
+        cls.dogs = Post.objects.create(
+            text='Собаки любят кости', author=cls.user)
+        Comment.objects.create(text='А моя кошка любит молоко',
+                               author=cls.user, post=cls.dogs)
+
+    def test_search_posts_and_comments(self):
+        self.assertEqual(set(search.search_ids('кошкам')),
+                         {SearchTest.cats.id, SearchTest.dogs.id})
+        self.assertEqual(search.search_ids('кости'), [SearchTest.dogs.id])
+        self.assertEqual(search.search_ids(''), [])
+        self.assertEqual(search.search_ids('"*'), [])
+
+    def test_index_follows_changes(self):
+        post = Post.objects.create(text='Жирафы', author=SearchTest.user)
+        self.assertEqual(search.search_ids('жираф'), [post.id])
+        post.text = 'Слоны'
+        post.save()
+        self.assertEqual(search.search_ids('жираф'), [])
+        post.delete()
+        self.assertEqual(search.search_ids('слоны'), [])
+
+    def test_search_page(self):
+        response = Client().get(reverse('posts:search'), {'q': 'собака'})
+        self.assertEqual(list(response.context['page']), [SearchTest.dogs])
+
+    def test_rebuild_search_index(self):
+        search.clear()
+        self.assertEqual(search.search_ids('рыбу'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(search.search_ids('рыбу'), [SearchTest.cats.id])
@@ -0,0 +1,81 @@
+from threading import Thread
+from time import sleep
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from ..feed_cache import cache_feed
+from ..models import Post, User
+from .fake_redis import FakeRedisServer
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+@skipUnless(redis, 'нужен пакет redis')
+class SharedCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeRedisServer().start()
+        cls.settings_override = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': cls.server.url,
+            'KEY_PREFIX': 'yatube_test',
+        }})
+        cls.settings_override.enable()
+        super().setUpClass()
+        cls.user = User.objects.create(username='User')
+        Post.objects.create(text='Test text', author=cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.settings_override.disable()
+        cls.server.stop()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cache_operations(self):
+        self.assertTrue(cache.add('key', {'a': 1}, 10))
+        self.assertFalse(cache.add('key', 'other', 10))
+        self.assertEqual(cache.get('key'), {'a': 1})
+        cache.set('counter', 1, None)
+        self.assertEqual(cache.incr('counter', 5), 6)
+        self.assertTrue(cache.delete('key'))
+        self.assertIsNone(cache.get('key'))
+        self.assertTrue(all(
+            key.startswith(b'yatube_test:')
+            for key in SharedCacheTest.server.storage.data))
+
+    def test_index_page_shared_between_clients(self):
+        url = reverse('posts:index')
+        content = Client().get(url).content
+        Post.objects.create(text='Silent post', author=SharedCacheTest.user)
+        self.assertEqual(Client().get(url).content, content)
+
+    def test_only_one_request_renders_page(self):
+        renders = []
+
+        @cache_feed(key_prefix='stampede')
+        def slow_view(request):
+            renders.append(1)
+            sleep(0.2)
+            return HttpResponse('page')
+
+        request = RequestFactory().get('/stampede/')
+        responses = []
+        threads = [
+            Thread(target=lambda: responses.append(slow_view(request)))
+            for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(renders), 1)
+        self.assertEqual([response.content for response in responses],
+                         [b'page'] * 5)
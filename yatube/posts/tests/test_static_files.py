@@ -0,0 +1,65 @@
+import gzip
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from yatube.static_files import (IMMUTABLE, CompressedManifestStorage,
+                                 StaticFilesMiddleware)
+
+STATIC_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(STATIC_ROOT=STATIC_ROOT)
+class StaticFilesTest(SimpleTestCase):
+    """Собранная статика с хэшем в имени отдаётся сжатой и immutable."""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, stdout=StringIO())
+        cls.middleware = StaticFilesMiddleware(lambda request: HttpResponse())
+        cls.factory = RequestFactory()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def get(self, path, **headers):
+        return self.middleware(self.factory.get(path, **headers))
+
+    def hashed_url(self, name):
+        return '/static/' + CompressedManifestStorage().stored_name(name)
+
+    def test_hashed_file_is_immutable_and_compressed(self):
+        url = self.hashed_url('admin/css/base.css')
+        response = self.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        body = gzip.decompress(b''.join(response.streaming_content))
+        self.assertIn(b'body', body)
+
+    def test_plain_copy_without_accept_encoding(self):
+        response = self.get(self.hashed_url('admin/css/base.css'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_accept_encoding_quality(self):
+        url = self.hashed_url('admin/css/base.css')
+        for header, encoding in (('gzip;q=0, deflate', None),
+                                 ('GZIP; q=0.5', 'gzip'),
+                                 ('*;q=0', None),
+                                 ('br;q=0, *', 'gzip'),
+                                 ('xgzip', None)):
+            with self.subTest(header=header):
+                response = self.get(url, HTTP_ACCEPT_ENCODING=header)
+                self.assertEqual(response.get('Content-Encoding'), encoding)
+
+    def test_other_paths_reach_views(self):
+        response = self.get('/static/missing.css')
+        self.assertFalse(response.has_header('Cache-Control'))
+        response = self.get('/static/admin/css/base.css')
+        self.assertNotEqual(response['Cache-Control'], IMMUTABLE)
@@ -0,0 +1,103 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from .. import thumbnails
+from ..models import Post, ThumbnailTask, User
+
+TEST_DIR = tempfile.mkdtemp()
+SMALL_GIF = (b'\x47\x49\x46\x38\x39\x61\x02\x00'
+             b'\x01\x00\x80\x00\x00\x00\x00\x00'
+             b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+             b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+             b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+             b'\x0A\x00\x3B')
+
+
+@override_settings(MEDIA_ROOT=TEST_DIR, THUMBNAIL_WORKER_THREADS=0)
+class ThumbnailQueueTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='User')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(ThumbnailQueueTest.user)
+
+    def test_upload_does_not_render_thumbnails_inline(self):
+        image = SimpleUploadedFile('small.gif', SMALL_GIF,
+                                   content_type='image/gif')
+        self.client.post(reverse('posts:new_post'),
+                         data={'text': 'Test text', 'image': image})
+        post = Post.objects.get()
+        self.assertTrue(post.thumbnails_pending)
+        self.assertEqual(ThumbnailTask.objects.count(), 1)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, post.image.url)
+
+        self.assertEqual(thumbnails.run_pending(), 1)
+        post.refresh_from_db()
+        self.assertFalse(post.thumbnails_pending)
+        self.assertFalse(ThumbnailTask.objects.exists())
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotContains(response, f'src="{post.image.url}"')
+        self.assertContains(response, 'cache/')
+
+    def test_failed_task_retried_then_dropped(self):
+        post = Post.objects.create(text='Test text', image='posts/none.gif',
+                                   author=ThumbnailQueueTest.user)
+        thumbnails.enqueue(post)
+        with mock.patch.object(thumbnails, 'get_thumbnail',
+                               side_effect=OSError) as get_thumbnail:
+            for _ in range(thumbnails.MAX_ATTEMPTS):
+                ThumbnailTask.objects.update(locked_until=None)
+                thumbnails.run_pending()
+        self.assertEqual(get_thumbnail.call_count, thumbnails.MAX_ATTEMPTS)
+        self.assertFalse(ThumbnailTask.objects.exists())
+        post.refresh_from_db()
+        self.assertFalse(post.thumbnails_pending)
+
+    def test_removing_image_drops_pending_thumbnails(self):
+        image = SimpleUploadedFile('small.gif', SMALL_GIF,
+                                   content_type='image/gif')
+        self.client.post(reverse('posts:new_post'),
+                         data={'text': 'Test text', 'image': image})
+        post = Post.objects.get()
+        self.client.post(
+            reverse('posts:post_edit', kwargs={
+                'username': 'User', 'post_id': post.id}),
+            data={'text': 'Test text', 'image-clear': 'on'})
+        post.refresh_from_db()
+        self.assertFalse(post.image)
+        self.assertFalse(post.thumbnails_pending)
+        self.assertFalse(ThumbnailTask.objects.exists())
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_card_has_responsive_lazy_picture(self):
+        image = SimpleUploadedFile('small.gif', SMALL_GIF,
+                                   content_type='image/gif')
+        post = Post.objects.create(text='Test text', image=image,
+                                   author=ThumbnailQueueTest.user)
+        response = self.client.get(reverse('posts:index'))
+        for width in thumbnails.WIDTHS:
+            self.assertContains(response, f' {width}w', count=1 + len(
+                thumbnails.modern_formats()))
+        self.assertContains(response, 'width="960" height="339"')
+        self.assertContains(response, 'loading="lazy"')
+        self.assertNotContains(response, f'src="{post.image.url}"')
+        if 'WEBP' in thumbnails.modern_formats():
+            self.assertContains(response, 'type="image/webp"')
+        self.assertEqual(len(thumbnails.PRESETS), len(thumbnails.WIDTHS) * (
+            1 + len(thumbnails.modern_formats())))
@@ -0,0 +1,60 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from .. import timeline
+from ..models import Follow, Post, TimelineEntry, User, UserStats
+
+
+@override_settings(TIMELINE_ENABLED=True, TIMELINE_SIZE=3,
+                   TIMELINE_FANOUT_LIMIT=1)
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='Author')
+        cls.reader = User.objects.create(username='Reader')
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(TimelineTest.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(TimelineTest.reader)
+
+    def follow(self, client, username):
+        client.get(reverse('posts:profile_follow',
+                           kwargs={'username': username}))
+
+    def test_new_post_goes_to_follower_timeline(self):
+        self.follow(self.reader_client, 'Author')
+        for i in range(5):
+            self.author_client.post(reverse('posts:new_post'),
+                                    data={'text': f'Test text {i}'})
+        entries = TimelineEntry.objects.filter(user=TimelineTest.reader)
+        # лента ограничена TIMELINE_SIZE самыми новыми постами
+        self.assertEqual(
+            list(entries.values_list('post_id', flat=True)
+                 .order_by('-post_id')),
+            list(Post.objects.values_list('id', flat=True)[:3]))
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page']),
+                         list(Post.objects.all()[:3]))
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        Post.objects.create(text='Test text', author=TimelineTest.author)
+        self.follow(self.reader_client, 'Author')
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=TimelineTest.reader).exists())
+        self.reader_client.get(reverse('posts:profile_unfollow',
+                                       kwargs={'username': 'Author'}))
+        self.assertFalse(TimelineEntry.objects.filter(
+            user=TimelineTest.reader).exists())
+
+    def test_celebrity_posts_read_on_demand(self):
+        fan = User.objects.create(username='Fan')
+        Follow.objects.create(user=fan, author=TimelineTest.author)
+        UserStats.objects.bump(TimelineTest.author.id, followers_count=1)
+        self.follow(self.reader_client, 'Author')
+        self.author_client.post(reverse('posts:new_post'),
+                                data={'text': 'Test text'})
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(list(timeline.feed(TimelineTest.reader)),
+                         list(Post.objects.all()))
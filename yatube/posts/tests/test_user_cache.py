@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import User
+
+
+class UserCacheTest(TestCase):
+    """Сессия и пользователь читаются из кэша, а не из базы."""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='User', password='pass')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.login(username='User', password='pass')
+        self.url = reverse('about:author')
+
+    def tables(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+            # Пользователь нужен шаблону, читаем его явно.
+            username = response.wsgi_request.user.username
+        return username, ' '.join(query['sql'] for query in queries)
+
+    def test_repeat_requests_skip_database(self):
+        self.tables()
+        username, sql = self.tables()
+        self.assertEqual(username, 'User')
+        self.assertNotIn('auth_user', sql)
+        self.assertNotIn('django_session', sql)
+
+    def test_profile_change_is_visible(self):
+        self.tables()
+        user = User.objects.get(id=UserCacheTest.user.id)
+        user.username = 'Renamed'
+        user.save()
+        self.assertEqual(self.tables()[0], 'Renamed')
+
+    def test_password_change_logs_out_other_sessions(self):
+        self.tables()
+        user = User.objects.get(id=UserCacheTest.user.id)
+        user.set_password('other')
+        user.save()
+        self.assertEqual(self.tables()[0], '')
+
+    def test_logout_forgets_user(self):
+        self.tables()
+        self.client.logout()
+        self.assertEqual(self.tables()[0], '')
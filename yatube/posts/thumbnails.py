@@ -0,0 +1,135 @@
+"""Фоновая подготовка миниатюр для загруженных картинок.
+
+Загрузка ставит задачу в таблицу ThumbnailTask, а миниатюры всех
+размеров и форматов для srcset карточки строит пул потоков
+(THUMBNAIL_WORKER_THREADS) или отдельный процесс
+`manage.py process_thumbnails`. Пока задача не выполнена, карточка
+поста показывает исходную картинку и запрос не ждёт Pillow.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image
+from sorl.thumbnail import get_thumbnail
+from sorl.thumbnail.base import EXTENSIONS
+
+from .feed_cache import bump_feed_generation, post_scopes
+from .models import Post, ThumbnailTask
+
+# Ширины для srcset карточки, высота - в пропорции баннера 960x339.
+WIDTHS = (480, 960, 1440)
+DEFAULT_WIDTH = 960
+ASPECT = 339 / 960
+OPTIONS = {'crop': 'center', 'upscale': True}
+MAX_ATTEMPTS = 3
+LOCK_TIME = timedelta(minutes=5)
+
+
+def modern_formats():
+    """Форматы компактнее JPEG, которые умеют и sorl, и этот Pillow."""
+    Image.init()
+    return [fmt for fmt in ('AVIF', 'WEBP')
+            if fmt in EXTENSIONS and fmt in Image.SAVE]
+
+
+def geometry(width):
+    return f'{width}x{round(width * ASPECT)}'
+
+
+def options(fmt=None):
+    return dict(OPTIONS, format=fmt) if fmt else dict(OPTIONS)
+
+
+# Все варианты, которые выводит тег post_picture.
+PRESETS = [(geometry(width), options(fmt))
+           for fmt in [None] + modern_formats() for width in WIDTHS]
+
+_executor = None
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKER_THREADS,
+            thread_name_prefix='thumbnails')
+    return _executor
+
+
+def enqueue(post):
+    """Ставит миниатюры поста в очередь после фиксации транзакции.
+
+    Если картинку убрали, снимает задачи и признак ожидания миниатюр.
+    """
+    if not post.image:
+        ThumbnailTask.objects.filter(post_id=post.id).delete()
+        if post.thumbnails_pending:
+            Post.objects.filter(id=post.id).update(thumbnails_pending=False)
+            post.thumbnails_pending = False
+        return
+    Post.objects.filter(id=post.id).update(thumbnails_pending=True)
+    post.thumbnails_pending = True
+    ThumbnailTask.objects.create(post=post)
+    if settings.THUMBNAIL_WORKER_THREADS:
+        transaction.on_commit(lambda: executor().submit(run_in_thread))
+
+
+def claim():
+    """Забирает из очереди одну свободную задачу."""
+    now = timezone.now()
+    with transaction.atomic():
+        task = ThumbnailTask.objects.select_for_update(
+            skip_locked=True).filter(
+                Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+        ).select_related('post').first()
+        if task is None:
+            return None
+        task.attempts += 1
+        task.locked_until = now + LOCK_TIME
+        task.save(update_fields=['attempts', 'locked_until'])
+    return task
+
+
+def finish(task):
+    task.delete()
+    if not ThumbnailTask.objects.filter(post_id=task.post_id).exists():
+        Post.objects.filter(id=task.post_id).update(thumbnails_pending=False)
+        post = Post.objects.select_related('author', 'group').filter(
+            id=task.post_id).first()
+        if post is not None:
+            bump_feed_generation(*post_scopes(post))
+
+
+def process(task):
+    try:
+        for geometry, options in PRESETS:
+            get_thumbnail(task.post.image, geometry, **options)
+    except Exception:
+        if task.attempts < MAX_ATTEMPTS:
+            return False
+    # После последней неудачи карточка вернётся к ленивой генерации.
+    finish(task)
+    return True
+
+
+def run_pending(limit=None):
+    """Выполняет задачи, пока очередь не опустеет; возвращает их число."""
+    done = 0
+    while limit is None or done < limit:
+        task = claim()
+        if task is None:
+            break
+        process(task)
+        done += 1
+    return done
+
+
+def run_in_thread():
+    try:
+        run_pending()
+    finally:
+        connections.close_all()
@@ -0,0 +1,71 @@
+"""Предрассчитанные ленты подписок (fan-out on write).
+
+При публикации id поста раскладывается в ленты подписчиков автора,
+поэтому follow_index читает одну таблицу вместо JOIN по подпискам.
+Посты авторов с числом подписчиков больше TIMELINE_FANOUT_LIMIT
+не раскладываются, а подмешиваются при чтении (fan-out on read).
+"""
+from django.conf import settings
+from django.db.models import OuterRef, Q, Subquery
+
+from .models import Follow, Post, TimelineEntry, UserStats
+
+
+def is_enabled():
+    return settings.TIMELINE_ENABLED
+
+
+def is_celebrity(author_id):
+    return UserStats.objects.filter(
+        user_id=author_id,
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT).exists()
+
+
+def trim(user_ids):
+    """Оставляет в лентах только TIMELINE_SIZE самых новых записей."""
+    oldest_kept = TimelineEntry.objects.filter(
+        user=OuterRef('user')).order_by('-post_id').values('post_id')[
+            settings.TIMELINE_SIZE - 1:settings.TIMELINE_SIZE]
+    TimelineEntry.objects.filter(
+        user_id__in=user_ids, post_id__lt=Subquery(oldest_kept)).delete()
+
+
+def fan_out(post):
+    if not is_enabled() or is_celebrity(post.author_id):
+        return
+    followers = list(Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True))
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(user_id=user_id, post=post) for user_id in followers),
+        ignore_conflicts=True)
+    trim(followers)
+
+
+def backfill(user, author):
+    if not is_enabled() or is_celebrity(author.id):
+        return
+    post_ids = Post.objects.filter(author=author).values_list(
+        'id', flat=True)[:settings.TIMELINE_SIZE]
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(user=user, post_id=post_id) for post_id in post_ids),
+        ignore_conflicts=True)
+    trim([user.id])
+
+
+def prune(user, author):
+    if is_enabled():
+        TimelineEntry.objects.filter(user=user, post__author=author).delete()
+
+
+def feed(user):
+    """Посты авторов, на которых подписан user, для ленты подписок."""
+    posts = Post.objects.for_feed()
+    if not is_enabled():
+        return posts.filter(author__following__user=user)
+    timeline = TimelineEntry.objects.filter(user=user).order_by(
+        '-post_id').values('post_id')[:settings.TIMELINE_SIZE]
+    celebrities = Follow.objects.filter(
+        user=user,
+        author__stats__followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).values('author_id')
+    return posts.filter(Q(id__in=timeline) | Q(author_id__in=celebrities))
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 
 app_name = 'posts'
@@ -9,10 +9,20 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group'),
     path('new/', views.new_post, name='new_post'),
     path("follow/", views.follow_index, name="follow_index"),
+    path('search/', views.search_posts, name='search'),
+    path('api/posts/', api.index, name='api_index'),
+    path('api/groups/<slug:slug>/posts/', api.group_posts, name='api_group'),
+    path('api/users/<str:username>/posts/',
+         api.profile, name='api_profile'),
+    path('api/follow/posts/', api.follow_index, name='api_follow_index'),
+    path('api/posts/<int:post_id>/comments/',
+         api.comments, name='api_comments'),
     path('<str:username>/', views.profile, name='profile'),
     path('<str:username>/<int:post_id>/', views.post_view, name='post'),
     path('<str:username>/<int:post_id>/comment',
          views.add_comment, name='add_comment'),
+    path('<str:username>/<int:post_id>/comments/',
+         views.comments, name='comments'),
     path('<str:username>/<int:post_id>/edit/',
          views.post_edit, name='post_edit'),
     path("<str:username>/follow/",
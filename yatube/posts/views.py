@@ -1,64 +1,159 @@
+from hashlib import md5
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
-from yatube.settings import POSTS_ON_PAGE
+from django.views.decorators.http import condition
+from yatube.async_views import aget_object_or_404, arender, async_guard
+from yatube.db_router import read_from_replica
+from yatube.settings import COMMENTS_ON_PAGE, POSTS_ON_PAGE
+from . import follow_graph, search, thumbnails, timeline
+from .feed_cache import (SITE, bump_feed_generation, bump_pages, cache_feed,
+                         feed_changed, feed_generation, post_scopes,
+                         scoped_generation)
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .models import Follow, Group, Post, User, UserStats
+from .paginators import CursorPaginator, KnownCountPaginator
+from .publishing import publish_comment, publish_post
 
 
-def paginator_in_view(request, post_list):
-    paginator = Paginator(post_list, POSTS_ON_PAGE)
+def paginator_in_view(request, post_list, count=None):
+    if count is not None:
+        # Число записей из счётчика вместо COUNT(*).
+        paginator = KnownCountPaginator(post_list, POSTS_ON_PAGE, count)
+    else:
+        paginator = Paginator(post_list, POSTS_ON_PAGE)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
 
 
-@cache_page(20, key_prefix='index_page')
-def index(request):
-    page = paginator_in_view(request, Post.objects.all())
-    return render(request, 'posts/index.html', {'page': page})
+async def cursor_page(request, object_list, per_page=POSTS_ON_PAGE):
+    paginator = CursorPaginator(object_list, per_page)
+    return await paginator.aget_page(request.GET.get(paginator.cursor_param))
 
 
-def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    page = paginator_in_view(request, group.posts.all())
-    context = {'group': group, 'page': page}
-    return render(request, 'posts/group.html', context)
+def post_comments(request, post):
+    """Страница комментариев поста по курсору, от новых к старым."""
+    paginator = CursorPaginator(
+        post.comments.select_related('author'), COMMENTS_ON_PAGE)
+    return paginator.get_page(request.GET.get(paginator.cursor_param))
 
 
-def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    page = paginator_in_view(request, author.posts.all())
-    following = (
-        request.user.is_authenticated
-        and request.user.username != username
-        and author.following.filter(user=request.user).exists())
-    context = {'author': author, 'page': page, 'following': following}
-    return render(request, 'posts/profile.html', context)
+def page_etag(request, *scopes, feed=False):
+    """ETag из поколений показанных частей сайта, адреса и зрителя.
+
+    Поколения читаются из кэша, проверка обходится без SQL. Поколение
+    автора-зрителя меняет меню и кнопки подписки на любой странице,
+    feed добавляет общее поколение ленты.
+    """
+    user = request.user
+    if user.is_authenticated:
+        scopes += (f'author.{user.username}',)
+    viewer = (user.pk, request.COOKIES.get(settings.CSRF_COOKIE_NAME))
+    version = repr((request.get_full_path(), viewer,
+                    scoped_generation(*scopes),
+                    feed and feed_generation()))
+    return md5(version.encode()).hexdigest()
+
+
+def index_etag(request):
+    return page_etag(request, feed=True)
+
+
+def group_etag(request, slug):
+    return page_etag(request, f'group.{slug}')
+
+
+def profile_etag(request, username):
+    return page_etag(request, f'author.{username}')
+
+
+def post_etag(request, username, post_id):
+    return page_etag(request, f'post.{post_id}')
+
 
+def post_last_modified(request, username, post_id):
+    return feed_changed(SITE, f'post.{post_id}')
 
-def post_view(request, username, post_id):
+
+@read_from_replica
+@async_guard(condition(etag_func=index_etag))
+@cache_feed(key_prefix='index_page')
+async def index(request):
+    page = await cursor_page(request, Post.objects.for_feed())
+    return await arender(request, 'posts/index.html', {'page': page})
+
+
+@read_from_replica
+@async_guard(condition(etag_func=group_etag))
+async def group_posts(request, slug):
+    group = await aget_object_or_404(Group, slug=slug)
+    page = await cursor_page(request, group.posts.for_feed())
+    context = {'group': group, 'page': page}
+    return await arender(request, 'posts/group.html', context)
+
+
+@read_from_replica
+@async_guard(condition(etag_func=profile_etag))
+async def profile(request, username):
+    author = await aget_object_or_404(User, username=username)
+    stats = (await UserStats.objects.filter(user=author).afirst()
+             or UserStats(user=author))
+    # Без строки счётчиков (их ещё не пересчитали) записи считает COUNT(*).
+    posts = author.posts.for_feed()
+    count = stats.posts_count if stats.pk else await posts.acount()
+    page = paginator_in_view(request, posts, count=count)
+    following = (request.user.username != username
+                 and await sync_to_async(follow_graph.is_following)(
+                     request.user.id, author.id))
+    context = {'author': author, 'stats': stats,
+               'page': page, 'following': following}
+    return await arender(request, 'posts/profile.html', context)
+
+
+@async_guard(condition(etag_func=post_etag,
+                       last_modified_func=post_last_modified))
+async def post_view(request, username, post_id):
     if request.user.is_authenticated:
-        return add_comment(request, username, post_id)
-    post = get_object_or_404(Post, id=post_id, author__username=username)
-    context = {'post': post, 'form': CommentForm()}
-    return render(request, 'posts/post.html', context)
+        return await sync_to_async(add_comment)(request, username, post_id)
+    post = await aget_object_or_404(
+        Post.objects.for_feed(), id=post_id, author__username=username)
+    comments = await cursor_page(
+        request, post.comments.select_related('author'), COMMENTS_ON_PAGE)
+    context = {'post': post, 'comments': comments,
+               'form': CommentForm(), 'is_author': False}
+    return await arender(request, 'posts/post.html', context)
+
+
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
+def comments(request, username, post_id):
+    """Следующая пачка комментариев HTML-фрагментом."""
+    post = get_object_or_404(Post.objects.select_related('author'),
+                             id=post_id, author__username=username)
+    return render(request, 'includes/comment_list.html',
+                  {'post': post, 'comments': post_comments(request, post)})
 
 
 @login_required
 def add_comment(request, username, post_id):
-    post = get_object_or_404(Post, id=post_id, author__username=username)
+    post = get_object_or_404(
+        Post.objects.for_feed(), id=post_id, author__username=username)
     form = CommentForm(request.POST or None)
     if not form.is_valid():
         return render(
-            request, 'posts/post.html', {'post': post,
-                                         'comments': post.comments.all(),
-                                         'form': form}
+            request, 'posts/post.html', {
+                'post': post,
+                'comments': post_comments(request, post),
+                'form': form,
+                'is_author': post.author == request.user}
         )
     instance = form.save(commit=False)
     instance.author = request.user
     instance.post = post
-    instance.save()
+    publish_comment(instance)
     return redirect('posts:post', username, post_id)
 
 
@@ -70,7 +165,7 @@ def new_post(request):
         return render(request, 'posts/new.html', context)
     instance = form.save(commit=False)
     instance.author = request.user
-    instance.save()
+    publish_post(instance)
     return redirect('posts:index')
 
 
@@ -84,29 +179,67 @@ def post_edit(request, username, post_id):
     if not form.is_valid():
         context = {'form': form, 'is_edit': True, 'post': post}
         return render(request, 'posts/new.html', context)
-    form.save()
+    # Пост мог уйти в другое сообщество: сбрасываются обе страницы.
+    scopes = post_scopes(post)
+    with transaction.atomic():
+        form.save()
+        if 'image' in form.changed_data:
+            thumbnails.enqueue(post)
+    bump_feed_generation(*scopes, *post_scopes(post))
     return redirect('posts:post', username, post_id)
 
 
-@login_required
-def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
-    page = paginator_in_view(request, post_list)
-    return render(request, 'posts/follow.html', {'page': page})
+def search_posts(request):
+    query = request.GET.get('q', '').strip()
+    page = paginator_in_view(request, search.search_ids(query))
+    posts = Post.objects.for_feed().in_bulk(page.object_list)
+    page.object_list = [
+        posts[post_id] for post_id in page.object_list if post_id in posts]
+    return render(request, 'posts/search.html', {'page': page, 'q': query})
+
+
+@read_from_replica
+@async_guard(login_required)
+async def follow_index(request):
+    page = await cursor_page(request, timeline.feed(request.user))
+    suggested_ids = await sync_to_async(follow_graph.suggestions)(
+        request.user.id)
+    users = await User.objects.ain_bulk(suggested_ids)
+    context = {'page': page, 'suggestions': [
+        users[user_id] for user_id in suggested_ids if user_id in users]}
+    return await arender(request, 'posts/follow.html', context)
 
 
 @login_required
 def profile_follow(request, username):
     if request.user.username != username:
         author = get_object_or_404(User, username=username)
-        Follow.objects.get_or_create(user=request.user, author=author)
+        with transaction.atomic():
+            _, created = Follow.objects.get_or_create(
+                user=request.user, author=author)
+            if created:
+                UserStats.objects.bump(request.user.id, following_count=1)
+                UserStats.objects.bump(author.id, followers_count=1)
+                timeline.backfill(request.user, author)
+        if created:
+            # Счётчики и кнопка подписки видны в профилях обоих.
+            bump_pages(f'author.{username}',
+                       f'author.{request.user.username}')
     return redirect('posts:profile', username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    Follow.objects.filter(
-        user=request.user, author__username=username).delete()
+    author = get_object_or_404(User, username=username)
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(
+            user=request.user, author=author).delete()
+        if deleted:
+            UserStats.objects.bump(request.user.id, following_count=-deleted)
+            UserStats.objects.bump(author.id, followers_count=-deleted)
+            timeline.prune(request.user, author)
+    if deleted:
+        bump_pages(f'author.{username}', f'author.{request.user.username}')
     return redirect('posts:profile', username)
 
 
@@ -0,0 +1,51 @@
+"""Помощники для async-view.
+
+В Django 4.1 у ORM есть асинхронные методы (aget, afirst, async for),
+но condition, login_required и get_object_or_404 работают только
+с синхронными view. async_guard применяет такой декоратор к заглушке
+в потоке: если декоратор сам ответил (304, редирект на вход), view не
+вызывается, иначе его заголовки (ETag, Last-Modified) переносятся
+в ответ view. Заодно в потоке загружается request.user, и дальше view
+читает его без обращения к базе.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.shortcuts import render
+
+
+def async_guard(decorator):
+    def wrap(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            passed = HttpResponse()
+
+            def check(request, *args, **kwargs):
+                request.user.is_authenticated
+                return decorator(lambda *args, **kwargs: passed)(
+                    request, *args, **kwargs)
+            response = await sync_to_async(check)(request, *args, **kwargs)
+            if response is not passed:
+                return response
+            response = await view(request, *args, **kwargs)
+            for header, value in passed.items():
+                if header != 'Content-Type':
+                    response.headers.setdefault(header, value)
+            return response
+        return wrapper
+    return wrap
+
+
+async def aget_object_or_404(klass, **kwargs):
+    """get_object_or_404 на aget; klass - модель, менеджер или queryset."""
+    queryset = getattr(klass, '_default_manager', klass)
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(
+            f'No {queryset.model._meta.object_name} matches the given query.')
+
+
+# Шаблоны и ленивые поля моделей синхронны, поэтому render идёт в потоке.
+arender = sync_to_async(render)
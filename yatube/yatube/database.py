@@ -0,0 +1,35 @@
+"""Настройка соединений с базой из профиля DATABASES.
+
+SQLite: на каждом новом соединении выполняются SQLITE_PRAGMAS - журнал
+WAL, при котором читатели не ждут пишущего, synchronous=NORMAL,
+отображение файла в память и ожидание блокировки вместо ошибки
+"database is locked". PostgreSQL: при CONN_HEALTH_CHECKS долгоживущее
+(CONN_MAX_AGE) соединение перед запросом проверяется и, если сервер
+его разорвал, закрывается, чтобы Django открыл новое.
+"""
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def check_connection(connection):
+    if (connection.connection is not None
+            and connection.settings_dict.get('CONN_HEALTH_CHECKS')
+            and not connection.is_usable()):
+        connection.close()
+
+
+@receiver(request_started)
+def check_connections(**kwargs):
+    for connection in connections.all():
+        check_connection(connection)
@@ -0,0 +1,127 @@
+"""Чтение лент и профилей с реплик базы.
+
+Запись всегда идёт в default. Чтение уходит на одну из реплик
+DATABASE_REPLICAS только внутри view, помеченных read_from_replica,
+и только если этот браузер ничего не записывал последние
+REPLICA_STICKY_SECONDS секунд: после записи ReplicaMiddleware ставит
+cookie, и до её истечения все чтения идут в default, чтобы автор сразу
+видел свой пост, комментарий или подписку, даже если реплика отстаёт.
+
+Страницы лент кэшируются и получают ETag по поколению ленты. Чтобы
+под новым поколением не сохранилась страница с отстающей реплики,
+все читают из default ещё REPLICA_STICKY_SECONDS секунд после любой
+смены поколения.
+"""
+import asyncio
+from contextvars import ContextVar
+from datetime import timedelta
+from functools import wraps
+from random import choice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+from posts.feed_cache import feed_changed
+
+STICKY_COOKIE = 'use_primary'
+
+current = ContextVar('replica_state', default=None)
+
+
+class State:
+    """Состояние одного запроса."""
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.replica = False
+        self.written = False
+
+
+def replicas_behind():
+    """Реплики могли ещё не получить последнее изменение ленты."""
+    return feed_changed() > timezone.now() - timedelta(
+        seconds=settings.REPLICA_STICKY_SECONDS)
+
+
+def choose_database():
+    state = current.get()
+    if state is not None and not state.pinned:
+        state.replica = not replicas_behind()
+
+
+def read_from_replica(view):
+    """Разрешает view и его проверкам условий читать с реплики."""
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            await sync_to_async(choose_database)()
+            return await view(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        choose_database()
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = current.get()
+        if (settings.DATABASE_REPLICAS and state is not None
+                and state.replica and not state.pinned):
+            return choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        state = current.get()
+        if state is not None:
+            # Дальше в этом запросе читаем то, что только что записали.
+            state.written = state.pinned = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными от основной базы.
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        state = State(STICKY_COOKIE in request.COOKIES)
+        token = current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        state = State(STICKY_COOKIE in request.COOKIES)
+        token = current.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.finish(response, state)
+
+    def finish(self, response, state):
+        if state.written:
+            response.set_cookie(
+                STICKY_COOKIE, '1', max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,268 @@
+"""Замеры запросов: время ответа, SQL, кэш и рендер шаблонов.
+
+MetricsMiddleware измеряет каждый запрос, отдаёт замеры в заголовке
+Server-Timing, копит итоги по view для /metrics/ в текстовом формате
+Prometheus и пишет медленные запросы вместе с их SQL в лог
+yatube.metrics. Итоги хранятся в памяти процесса, поэтому каждый
+воркер отдаёт свои.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from contextvars import ContextVar
+from functools import wraps
+from random import random
+from threading import Lock
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse
+from django.template.backends.django import Template
+
+logger = logging.getLogger('yatube.metrics')
+
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+LOGGED_QUERIES = 50
+MISSING = object()
+
+current = ContextVar('metrics_recorder', default=None)
+
+
+class Recorder:
+    """Замеры одного запроса."""
+    def __init__(self):
+        self.queries = []
+        self.db_time = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0
+        self.template_depth = 0
+
+    def server_timing(self, duration):
+        return ', '.join((
+            f'total;dur={duration * 1000:.1f}',
+            f'db;dur={self.db_time * 1000:.1f};'
+            f'desc="{len(self.queries)} queries"',
+            f'cache;desc="{self.cache_hits} hits, '
+            f'{self.cache_misses} misses"',
+            f'template;dur={self.template_time * 1000:.1f}',
+        ))
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = current.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = perf_counter() - started
+        recorder.db_time += duration
+        recorder.queries.append((sql, duration))
+
+
+@receiver(connection_created)
+def add_query_recorder(sender, connection, **kwargs):
+    # Соединения у каждого потока свои: обёртку получает каждое новое,
+    # и под ASGI view находит замеры по контекстной переменной current.
+    if (settings.METRICS_ENABLED
+            and record_query not in connection.execute_wrappers):
+        connection.execute_wrappers.append(record_query)
+
+
+def counted_get(get):
+    @wraps(get)
+    def wrapper(self, key, default=None, version=None):
+        value = get(self, key, MISSING, version)
+        recorder = current.get()
+        if recorder is not None:
+            if value is MISSING:
+                recorder.cache_misses += 1
+            else:
+                recorder.cache_hits += 1
+        return default if value is MISSING else value
+    wrapper.instrumented = True
+    return wrapper
+
+
+def timed_render(render):
+    @wraps(render)
+    def wrapper(self, *args, **kwargs):
+        recorder = current.get()
+        if recorder is None:
+            return render(self, *args, **kwargs)
+        # Вложенные шаблоны уже входят во время внешнего.
+        recorder.template_depth += 1
+        started = perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            recorder.template_depth -= 1
+            if not recorder.template_depth:
+                recorder.template_time += perf_counter() - started
+    wrapper.instrumented = True
+    return wrapper
+
+
+def instrument():
+    """Один раз оборачивает чтение кэша и рендер шаблонов.
+
+    SQL замеряет add_query_recorder: модуль загружается в ready()
+    приложения posts, до первого соединения с базой.
+    """
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        if not getattr(backend.get, 'instrumented', False):
+            backend.get = counted_get(backend.get)
+    if not getattr(Template.render, 'instrumented', False):
+        Template.render = timed_render(Template.render)
+
+
+def escape(value):
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+class Registry:
+    """Итоги по view с начала работы процесса."""
+    def __init__(self):
+        self.lock = Lock()
+        self.requests = defaultdict(int)
+        self.buckets = defaultdict(lambda: [0] * (len(BUCKETS) + 1))
+        self.totals = defaultdict(lambda: defaultdict(float))
+
+    def observe(self, view, status, duration, recorder):
+        bucket = next((i for i, bound in enumerate(BUCKETS)
+                       if duration <= bound), len(BUCKETS))
+        with self.lock:
+            self.requests[view, status] += 1
+            self.buckets[view][bucket] += 1
+            totals = self.totals[view]
+            totals['duration'] += duration
+            totals['queries'] += len(recorder.queries)
+            totals['db'] += recorder.db_time
+            totals['cache_hits'] += recorder.cache_hits
+            totals['cache_misses'] += recorder.cache_misses
+            totals['template'] += recorder.template_time
+
+    def render(self):
+        with self.lock:
+            requests = dict(self.requests)
+            buckets = {view: list(counts)
+                       for view, counts in self.buckets.items()}
+            totals = {view: dict(values)
+                      for view, values in self.totals.items()}
+        lines = [
+            '# HELP yatube_requests_total Обработанные запросы.',
+            '# TYPE yatube_requests_total counter',
+        ]
+        lines += [
+            f'yatube_requests_total{{view="{escape(view)}",'
+            f'status="{status}"}} {count}'
+            for (view, status), count in sorted(requests.items())]
+        lines += [
+            '# HELP yatube_request_duration_seconds Время ответа.',
+            '# TYPE yatube_request_duration_seconds histogram',
+        ]
+        for view, counts in sorted(buckets.items()):
+            label = f'view="{escape(view)}"'
+            total = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), counts):
+                total += count
+                lines.append(
+                    'yatube_request_duration_seconds_bucket'
+                    f'{{{label},le="{bound}"}} {total}')
+            lines.append(f'yatube_request_duration_seconds_sum{{{label}}} '
+                         f'{totals[view]["duration"]:.6f}')
+            lines.append(
+                f'yatube_request_duration_seconds_count{{{label}}} {total}')
+        for name, key, kind, help_text in (
+                ('yatube_db_queries_total', 'queries', 'counter',
+                 'SQL-запросы.'),
+                ('yatube_db_duration_seconds_total', 'db', 'counter',
+                 'Время SQL-запросов.'),
+                ('yatube_cache_hits_total', 'cache_hits', 'counter',
+                 'Попадания в кэш.'),
+                ('yatube_cache_misses_total', 'cache_misses', 'counter',
+                 'Промахи кэша.'),
+                ('yatube_template_duration_seconds_total', 'template',
+                 'counter', 'Время рендера шаблонов.')):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+            lines += [
+                f'{name}{{view="{escape(view)}"}} {values[key]:g}'
+                for view, values in sorted(totals.items())]
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def log_slow(request, view, duration, recorder):
+    slowest = sorted(recorder.queries, key=lambda query: -query[1])
+    logger.warning(
+        'Медленный запрос %s %s (%s): %.0f мс, SQL %d за %.0f мс\n%s',
+        request.method, request.get_full_path(), view, duration * 1000,
+        len(recorder.queries), recorder.db_time * 1000,
+        '\n'.join(f'{seconds * 1000:.1f} мс: {sql}'
+                  for sql, seconds in slowest[:LOGGED_QUERIES]))
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Как у MiddlewareMixin: под ASGI замеры не занимают поток.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        instrument()
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        recorder = Recorder()
+        token = current.set(recorder)
+        started = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder = Recorder()
+        token = current.set(recorder)
+        started = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    def finish(self, request, response, recorder, started):
+        duration = perf_counter() - started
+        # Для адресов без маршрута одна метка, чтобы не плодить ряды.
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        registry.observe(view, response.status_code, duration, recorder)
+        response['Server-Timing'] = recorder.server_timing(duration)
+        if (duration * 1000 >= settings.SLOW_REQUEST_MS
+                and random() < settings.SLOW_REQUEST_SAMPLE_RATE):
+            log_slow(request, view, duration, recorder)
+        return response
+
+
+def metrics_view(request):
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -21,22 +21,29 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
-    # 'django.contrib.staticfiles',
-    'debug_toolbar',
+    'django.contrib.staticfiles',
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'yatube.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'yatube.static_files.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yatube.user_cache.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'yatube.db_router.ReplicaMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# Панель отладки только для разработки: на каждый запрос она тратит
+# больше, чем сам запрос.
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -59,13 +66,59 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Профиль базы (yatube/database.py): DB_ENGINE=sqlite или postgresql.
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='yatube'),
+            'USER': config('DB_USER', default='yatube'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            # Соединение переживает запрос, а перед следующим проверяется.
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': config(
+                'DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+            # .iterator() читает большие выборки серверным курсором;
+            # за pgbouncer в режиме transaction курсоры надо выключить.
+            'DISABLE_SERVER_SIDE_CURSORS': config(
+                'DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        }
+    }
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024,
+                        cast=int),
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
 }
 
+# Реплики для чтения лент и профилей (yatube/db_router.py): через
+# запятую NAME реплики, для СУБД с сервером - NAME@HOST. Остальные
+# параметры те же, что у default.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+        config('DATABASE_REPLICAS', default='', cast=Csv()), 1):
+    name, _, host = replica.partition('@')
+    alias = f'replica{number}'
+    DATABASES[alias] = {**DATABASES['default'], 'NAME': name,
+                        'TEST': {'MIRROR': 'default'}}
+    if host:
+        DATABASES[alias]['HOST'] = host
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['yatube.db_router.ReplicaRouter']
+# Сколько секунд после записи браузер читает только из default.
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=15, cast=int)
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME':
      'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -80,11 +133,39 @@ AUTH_PASSWORD_VALIDATORS = [
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
+# Общий для всех воркеров кэш: CACHE_BACKEND=redis или memcached
+# и адрес сервера в CACHE_LOCATION, например redis://127.0.0.1:6379/1
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+}
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': CACHE_BACKENDS[config('CACHE_BACKEND', default='locmem')],
+        'LOCATION': config('CACHE_LOCATION', default=''),
+        'KEY_PREFIX': config('CACHE_KEY_PREFIX', default='yatube'),
     }
 }
+# Страницы ленты сбрасываются по событиям (posts/feed_cache.py),
+# таймаут лишь освобождает место от устаревших поколений.
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+# Пока один воркер рендерит страницу, остальные ждут её в кэше.
+FEED_CACHE_LOCK_TIMEOUT = 10
+FEED_CACHE_LOCK_WAIT = 2
+
+# Сессии (SESSION_BACKEND): cached_db читает из кэша и пишет в базу,
+# signed_cookies хранит сессию в подписанной cookie без базы вовсе.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[
+    config('SESSION_BACKEND', default='cached_db')]
+# Пользователь сессии в кэше (yatube/user_cache.py).
+USER_CACHE_TIMEOUT = config('USER_CACHE_TIMEOUT', default=300, cast=int)
 
 LANGUAGE_CODE = 'ru'
 TIME_ZONE = 'UTC'
@@ -93,13 +174,52 @@ USE_L10N = True
 USE_TZ = True
 
 STATIC_URL = '/static/'
-#  STATIC_FILES = BASE_DIR / 'static'
-STATIC_ROOT = BASE_DIR / 'static'
+# Только файлы проекта: статику admin и debug_toolbar collectstatic
+# берёт из самих приложений, под их установленную версию.
+STATICFILES_DIRS = [BASE_DIR / 'static']
+# Сборка `manage.py collectstatic` (yatube/static_files.py): имена
+# с хэшем содержимого и сжатые копии .gz/.br рядом.
+STATIC_ROOT = config('STATIC_ROOT', default=str(BASE_DIR / 'staticfiles'))
+STATICFILES_STORAGE = 'yatube.static_files.CompressedManifestStorage'
+# Отдавать собранную статику самим, если перед Django нет nginx.
+STATIC_FILES_SERVE = config('STATIC_FILES_SERVE', default=True, cast=bool)
+# Для файлов без хэша в имени (favicon и т. п.).
+STATIC_FILES_MAX_AGE = 60 * 60
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Миниатюры строятся в фоне (posts/thumbnails.py): процессом
+# `manage.py process_thumbnails --loop` или пулом потоков веб-воркера,
+# если задать число потоков больше нуля.
+THUMBNAIL_WORKER_THREADS = config('THUMBNAIL_WORKER_THREADS', default=0, cast=int)
+
 LOGIN_URL = '/auth/login/'
 LOGIN_REDIRECT_URL = 'posts:index'
 LOGOUT_REDIRECT_URL = 'https://www.youtube.com/watch?v=IA_evL-1F0wэ'
 POSTS_ON_PAGE = 10
+COMMENTS_ON_PAGE = 20
+# Пачка строк для массовых действий админки.
+ADMIN_BATCH_SIZE = 1000
+SEARCH_MAX_RESULTS = 1000
+
+# Замеры запросов (yatube/metrics.py): заголовок Server-Timing,
+# /metrics/ для Prometheus и лог медленных запросов yatube.metrics.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+# Пустой список выключает /metrics/: за локальным прокси все запросы
+# приходят с 127.0.0.1.
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='', cast=Csv())
+SLOW_REQUEST_MS = config('SLOW_REQUEST_MS', default=500, cast=int)
+SLOW_REQUEST_SAMPLE_RATE = config(
+    'SLOW_REQUEST_SAMPLE_RATE', default=1.0, cast=float)
+
+# Предрассчитанные ленты подписок (posts/timeline.py)
+TIMELINE_ENABLED = config('TIMELINE_ENABLED', default=False, cast=bool)
+TIMELINE_SIZE = config('TIMELINE_SIZE', default=800, cast=int)
+TIMELINE_FANOUT_LIMIT = config('TIMELINE_FANOUT_LIMIT', default=5000, cast=int)
+
+# Граф подписок в кэше (posts/follow_graph.py) и рекомендации авторов
+# по подпискам второго уровня.
+FOLLOW_GRAPH_TIMEOUT = 60 * 60 * 24
+FOLLOW_SUGGESTIONS = 5
+FOLLOW_SUGGESTIONS_SAMPLE = 200
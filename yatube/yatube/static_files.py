@@ -0,0 +1,167 @@
+"""Статика с хэшем в имени, заранее сжатая gzip и brotli.
+
+`manage.py collectstatic` через CompressedManifestStorage копирует
+файлы в STATIC_ROOT под именами с хэшем содержимого и кладёт рядом
+сжатые копии .gz и .br (brotli - если установлен пакет Brotli).
+StaticFilesMiddleware отдаёт их без участия view: выбирает копию по
+Accept-Encoding, а файлы с хэшем в имени помечает immutable, так что
+браузер не перепроверяет их, пока не изменится ссылка.
+"""
+import asyncio
+import gzip
+import mimetypes
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponseNotAllowed
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.html', '.txt', '.json', '.xml',
+                '.map', '.ico', '.ttf', '.eot')
+# Сначала лучшее сжатие.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def compressors():
+    yield '.gz', lambda data: gzip.compress(data, 9, mtime=0)
+    if brotli is not None:
+        yield '.br', brotli.compress
+
+
+def accepted_encodings(header):
+    """{кодировка: q} из Accept-Encoding, q без указания равно 1."""
+    accepted = {}
+    for part in header.split(','):
+        coding, *params = part.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def compress_file(path):
+    """Пишет сжатые копии файла, если они меньше оригинала."""
+    data = Path(path).read_bytes()
+    for suffix, compress in compressors():
+        compressed = compress(data)
+        if len(compressed) < len(data):
+            Path(path + suffix).write_bytes(compressed)
+
+
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        processed = []
+        for name, hashed_name, done in super().post_process(
+                paths, dry_run, **options):
+            if done and not isinstance(done, Exception):
+                processed.append(hashed_name)
+            yield name, hashed_name, done
+        if dry_run:
+            return
+        for name in processed:
+            if name.endswith(COMPRESSIBLE):
+                compress_file(self.path(name))
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # До collectstatic (тесты, разработка) ссылка ведёт
+            # на исходный файл.
+            return name
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную статику до остальных middleware и view."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.STATIC_FILES_SERVE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Иначе Django выполнял бы async-view через поток.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        self.prefix = settings.STATIC_URL
+        self.files = self.scan(Path(settings.STATIC_ROOT))
+
+    def scan(self, root):
+        """{адрес: (путь, {кодировка: путь}, immutable)} по STATIC_ROOT."""
+        storage = CompressedManifestStorage()
+        hashed = set(storage.hashed_files.values())
+        files = {}
+        if not root.is_dir():
+            return files
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = Path(directory, name)
+                if path.suffix in ('.gz', '.br'):
+                    continue
+                relative = path.relative_to(root).as_posix()
+                variants = {
+                    encoding: str(path) + suffix
+                    for encoding, suffix in ENCODINGS
+                    if Path(str(path) + suffix).is_file()}
+                files[self.prefix + relative] = (
+                    str(path), variants, relative in hashed)
+        return files
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        found = self.files.get(request.path_info)
+        if found is None:
+            return self.get_response(request)
+        return self.respond(request, found)
+
+    async def __acall__(self, request):
+        found = self.files.get(request.path_info)
+        if found is None:
+            return await self.get_response(request)
+        return self.respond(request, found)
+
+    def respond(self, request, found):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        return self.serve(request, *found)
+
+    def serve(self, request, path, variants, immutable):
+        accepted = accepted_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        quality = {encoding: accepted.get(encoding, accepted.get('*', 0))
+                   for encoding in variants}
+        # При равном q берётся лучшее сжатие, q=0 запрещает кодировку.
+        encoding = max((encoding for encoding in variants
+                        if quality[encoding] > 0),
+                       key=quality.get, default=None)
+        content_type, _ = mimetypes.guess_type(path)
+        response = FileResponse(
+            open(variants[encoding] if encoding else path, 'rb'),
+            content_type=content_type or 'application/octet-stream')
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        response['Cache-Control'] = (
+            IMMUTABLE if immutable
+            else f'public, max-age={settings.STATIC_FILES_MAX_AGE}')
+        return response
@@ -20,6 +20,7 @@ from django.conf.urls.static import static
 from django.conf.urls import handler404, handler500
 from django.contrib import admin
 from django.urls import include, path
+from yatube.metrics import metrics_view
 
 
 handler404 = 'posts.views.page_not_found'  # noqa
@@ -30,6 +31,7 @@ urlpatterns = [
     path('about/', include('about.urls', namespace='about')),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
+    path('metrics/', metrics_view, name='metrics'),
     path('', include('posts.urls', namespace='posts')),
 ]
 if settings.DEBUG:
@@ -37,5 +39,3 @@ if settings.DEBUG:
     urlpatterns += (path("__debug__/", include(debug_toolbar.urls)),)
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(
-        settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -0,0 +1,61 @@
+"""Пользователь запроса из кэша вместо SELECT на каждый запрос.
+
+CachedAuthenticationMiddleware берёт пользователя сессии из кэша и
+сверяет хэш сессии так же, как django.contrib.auth.get_user: после
+смены пароля в сессии другой хэш, и такой пользователь читается из
+базы заново. Запись удаляется при сохранении или удалении
+пользователя и при выходе. При кэше в памяти процесса (locmem)
+другие воркеры увидят изменения только через USER_CACHE_TIMEOUT,
+поэтому в продакшене нужен общий кэш (CACHE_BACKEND).
+"""
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+
+def cache_key(user_id):
+    return f'session_user.{user_id}'
+
+
+def get_user(request):
+    user_id = request.session.get(auth.SESSION_KEY)
+    if user_id is None:
+        return auth.get_user(request)
+    user = cache.get(cache_key(user_id))
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(cache_key(user_id), user, settings.USER_CACHE_TIMEOUT)
+        return user
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    backend = request.session.get(auth.BACKEND_SESSION_KEY)
+    if (backend in settings.AUTHENTICATION_BACKENDS and session_hash
+            and constant_time_compare(
+                session_hash, user.get_session_auth_hash())):
+        return user
+    # Решение о выходе принимает проверка по базе.
+    return auth.get_user(request)
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_user(sender, instance, **kwargs):
+    cache.delete(cache_key(instance.pk))
+
+
+@receiver(user_logged_out)
+def forget_logged_out(sender, request, user, **kwargs):
+    if user is not None:
+        cache.delete(cache_key(user.pk))